@@ -0,0 +1,128 @@
+"""Lightweight inference backends for binary symptom vectors.
+
+Each backend exposes the same interface as CompiledForest, so the chatbot
+can swap engines without changing its output:
+
+    n_classes
+    predict_proba_active(active)   scores for one input, given its set feature indices
+    predict_proba(X)               scores for a dense (n_samples, n_features) 0/1 matrix
+
+Scores are per class in [0, 1], higher is better. The forest and naive
+Bayes return probabilities. The nearest-profile matcher returns the best
+Jaccard similarity between the input and any training profile of the
+class, so its confidence reads as "how much of the closest known case
+matches".
+
+Both backends here fit in milliseconds from the deduplicated training
+rows (see training_data.py), so they are built on first use rather than
+stored as artifacts.
+"""
+import numpy as np
+
+BACKENDS = ('forest', 'naive_bayes', 'jaccard')
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Per-word bit counts for NumPy releases without np.bitwise_count"""
+        counts = _BYTE_COUNTS[words.view(np.uint8)]
+        return counts.reshape(words.shape + (words.itemsize,)).sum(axis=-1)
+
+
+class BernoulliNaiveBayes:
+    """Bernoulli naive Bayes with Laplace smoothing, fit from weighted rows"""
+
+    def __init__(self, X, y, sample_weight, n_classes, alpha=1.0):
+        X = np.asarray(X, dtype=np.float64)
+        self.n_classes = n_classes
+        self.n_features = X.shape[1]
+
+        # Weighted per-class row totals and symptom counts
+        onehot = np.zeros((len(y), n_classes))
+        onehot[np.arange(len(y)), y] = sample_weight
+        class_count = onehot.sum(axis=0)
+        feature_count = onehot.T @ X
+
+        theta = (feature_count + alpha) / (class_count[:, None] + 2 * alpha)
+        log_prior = np.log(class_count / class_count.sum())
+
+        # log P(x | c) = sum_j log(1 - theta_cj) + sum_{j in x} [log theta_cj - log(1 - theta_cj)],
+        # so one input only needs its set features' columns of delta
+        self.delta = np.ascontiguousarray((np.log(theta) - np.log1p(-theta)).T)
+        self.base = log_prior + np.log1p(-theta).sum(axis=1)
+
+    def predict_proba_active(self, active):
+        joint = self.base + self.delta[active].sum(axis=0)
+        joint = np.exp(joint - joint.max())
+        return joint / joint.sum()
+
+    def predict_proba(self, X):
+        joint = self.base + np.asarray(X, dtype=np.float64) @ self.delta
+        joint = np.exp(joint - joint.max(axis=1, keepdims=True))
+        return joint / joint.sum(axis=1, keepdims=True)
+
+
+class NearestProfile:
+    """Best Jaccard similarity to each class's training profiles, by popcount over packed bits"""
+
+    def __init__(self, X, y, n_classes):
+        X = np.asarray(X, dtype=np.uint8)
+        self.n_classes = n_classes
+        self.n_features = X.shape[1]
+        self.n_words = -(-self.n_features // 64)
+
+        # Profiles grouped by class so a max-reduce per class is one reduceat call
+        order = np.argsort(y, kind='stable')
+        y = np.asarray(y)[order]
+        if len(np.unique(y)) != n_classes:
+            raise ValueError('Every class needs at least one training profile')
+        self.class_starts = np.searchsorted(y, np.arange(n_classes))
+
+        # Word-major layout: one contiguous (n_profiles,) row per 64-bit word
+        profiles = self.pack(X[order])
+        self.profile_words = np.ascontiguousarray(profiles.T)
+        self.profile_bits = popcount(profiles).sum(axis=1, dtype=np.int64)
+
+        # Feature-major copy for single queries, where a few row gathers beat a popcount pass
+        self.feature_profiles = np.ascontiguousarray(X[order].T, dtype=np.int64)
+
+    def pack(self, X):
+        """Pack 0/1 rows into little-endian uint64 words, shape (n_rows, n_words)"""
+        packed = np.packbits(X, axis=1, bitorder='little')
+        padded = np.zeros((X.shape[0], self.n_words * 8), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        return padded.view('<u8')
+
+    def similarity(self, query):
+        """Jaccard similarity of packed queries (n, n_words) to every profile, shape (n, n_profiles)"""
+        intersection = popcount(self.profile_words[0] & query[:, :1]).astype(np.int64)
+        for w in range(1, self.n_words):
+            intersection += popcount(self.profile_words[w] & query[:, w:w + 1])
+        # |a | b| = |a| + |b| - |a & b|, so only the intersection needs a popcount pass
+        query_bits = popcount(query).sum(axis=1, dtype=np.int64)[:, None]
+        union = self.profile_bits + query_bits - intersection
+        return intersection / np.maximum(union, 1)
+
+    def predict_proba_active(self, active):
+        active = np.unique(np.asarray(active, dtype=np.intp))
+        intersection = self.feature_profiles[active].sum(axis=0)
+        union = self.profile_bits + len(active) - intersection
+        similarity = intersection / np.maximum(union, 1)
+        return np.maximum.reduceat(similarity, self.class_starts)
+
+    def predict_proba(self, X):
+        similarity = self.similarity(self.pack(np.asarray(X, dtype=np.uint8)))
+        return np.maximum.reduceat(similarity, self.class_starts, axis=1)
+
+
+def build_backend(name, training_set, n_classes):
+    """Fit a non-forest backend on a TrainingSet whose labels use the model's class order"""
+    if name == 'naive_bayes':
+        return BernoulliNaiveBayes(training_set.X, training_set.y,
+                                   training_set.sample_weight, n_classes)
+    if name == 'jaccard':
+        return NearestProfile(training_set.X, training_set.y, n_classes)
+    raise ValueError(f"Unknown backend: {name}")
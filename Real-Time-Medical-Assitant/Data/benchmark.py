@@ -0,0 +1,316 @@
+"""Micro-benchmarks for the chatbot hot paths.
+
+Inputs come from Data/Testing.csv and Data/Testing_hindi.csv: each test
+row's symptoms are rendered as English, Hindi or Telugu phrases from the
+chatbot's own lexicon, and the test prognoses are used for lookups.
+
+Run from Real-Time-Medical-Assitant/:
+
+    python Data/benchmark.py run --output Data/benchmark_baseline.json
+    python Data/benchmark.py compare Data/benchmark_baseline.json
+    python Data/benchmark.py compare Data/benchmark_baseline.json --current after.json
+
+compare exits with status 1 if any benchmark's median is slower than the
+baseline by more than --threshold (default 25%).
+
+predict_condition[n] clears the prediction cache on every call and uses
+symptom sets that are not training profiles, so every call runs the
+engine with n symptoms. predict_condition_cached repeats the
+17-symptom sets without clearing, which times cache hits.
+
+run also reports where cold-start import time goes: a fresh interpreter
+builds a MedicalChatbot under -X importtime, and the self time of every
+imported module is summed per top-level package.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset import load_dataset
+from model import ChatbotCore, MedicalChatbot, prediction_cache
+from model_store import build_artifact, MODEL_PARAMS
+
+TESTING_FILE = 'Data/Testing.csv'
+TESTING_HINDI_FILE = 'Data/Testing_hindi.csv'
+BASELINE_FILE = 'Data/benchmark_baseline.json'
+CONNECTORS = {'en': ' and ', 'hi': ' और ', 'te': ' మరియు '}
+PREFIXES = {'en': 'i have ', 'hi': 'मुझे ', 'te': 'నాకు '}
+COLD_START_CODE = ("import sys, time; sys.path.insert(0, 'Data'); start = time.perf_counter(); "
+                   "from model import MedicalChatbot; MedicalChatbot(); "
+                   "print(time.perf_counter() - start)")
+
+# Training-only dependencies that the inference path should never import
+HEAVY_PACKAGES = ('pandas', 'sklearn', 'scipy', 'joblib')
+
+
+def measure(func, repeat=7, warmup=1, min_time=0.05):
+    """Time func with warm-up, auto-sized loops and repeats; returns per-call stats in microseconds"""
+    for _ in range(warmup):
+        func()
+
+    # Grow the loop count until one repeat takes at least min_time, like timeit.autorange
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return summarize(samples, number)
+
+
+def summarize(samples, number=1):
+    samples = sorted(samples)
+    return {
+        'median_us': statistics.median(samples),
+        'mean_us': statistics.fmean(samples),
+        'min_us': samples[0],
+        'max_us': samples[-1],
+        'repeat': len(samples),
+        'number': number
+    }
+
+
+def cycle(items):
+    """Callable factory that walks items round-robin so every input is exercised"""
+    state = {'i': 0}
+
+    def next_item():
+        item = items[state['i'] % len(items)]
+        state['i'] += 1
+        return item
+    return next_item
+
+
+def symptom_rows(path):
+    dataset = load_dataset(path)
+    rows = [[dataset.symptoms[i] for i in np.flatnonzero(row)] for row in dataset.X]
+    return rows, [str(p).strip() for p in dataset.labels]
+
+
+def render_text(chatbot, rows, rng):
+    """Turn symptom rows into free text in the chatbot's current language"""
+    phrases = {}
+    for phrase, symptom in chatbot.symptom_mapping.items():
+        # Prefer the localized phrase over the English fallback
+        if chatbot.language == 'en' or not phrase.isascii():
+            phrases.setdefault(symptom, []).append(phrase)
+    texts = []
+    for row in rows:
+        parts = [rng.choice(phrases.get(s, [s.replace('_', ' ')])) for s in row]
+        rng.shuffle(parts)
+        texts.append(PREFIXES[chatbot.language] + CONNECTORS[chatbot.language].join(parts))
+    return texts
+
+
+def bench_cold_start(repeat):
+    """Wall time of a fresh interpreter importing model and building a MedicalChatbot"""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', COLD_START_CODE], capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]) * 1e6)
+    return summarize(samples)
+
+
+def import_report(code=COLD_START_CODE):
+    """Import self time in microseconds per top-level package for a cold start, from -X importtime"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True,
+                            text=True, check=True).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(fields[0])
+    packages = dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+    return {
+        'total_us': sum(packages.values()),
+        'heavy': [name for name in HEAVY_PACKAGES if name in packages],
+        'packages': packages
+    }
+
+
+def run_benchmarks(repeat=7, quick=False):
+    rng = random.Random(42)
+    results = {}
+    cold_repeat = 2 if quick else max(3, repeat // 2)
+    train_repeat = 1 if quick else 3
+
+    print('cold construction...', file=sys.stderr)
+    results['construct_cold'] = bench_cold_start(cold_repeat)
+    imports = import_report()
+
+    core = ChatbotCore.shared()
+    results['construct_warm'] = measure(lambda: MedicalChatbot(core=core), repeat)
+
+    print('train_model...', file=sys.stderr)
+    fit_samples = []
+    for _ in range(train_repeat):
+        start = time.perf_counter()
+        build_artifact(core.df_training, MODEL_PARAMS)
+        fit_samples.append((time.perf_counter() - start) * 1e6)
+    results['train_model_fit'] = summarize(fit_samples)
+    results['train_model_load'] = measure(core.train_model, min(repeat, 3), min_time=0)
+
+    english_rows, english_names = symptom_rows(TESTING_FILE)
+    hindi_rows, hindi_names = symptom_rows(TESTING_HINDI_FILE)
+    inputs = {'en': english_rows, 'hi': hindi_rows, 'te': english_rows}
+
+    print('text pipeline...', file=sys.stderr)
+    chatbot = MedicalChatbot(core=core)
+    names = {}
+    for language, rows in inputs.items():
+        chatbot.change_language(language)
+        texts = render_text(chatbot, rows, rng)
+        next_text = cycle(texts)
+        results[f'extract_symptoms_from_text[{language}]'] = measure(
+            lambda: chatbot.extract_symptoms_from_text(next_text()), repeat)
+
+        short_texts = [text.split(CONNECTORS[language])[-1] for text in texts]
+        next_short = cycle(short_texts)
+        results[f'find_matching_symptom[{language}]'] = measure(
+            lambda: chatbot.find_matching_symptom(next_short()), repeat)
+        names[language] = {'en': english_names, 'hi': hindi_names}.get(language, chatbot.condition_names)
+
+    print('predict_condition...', file=sys.stderr)
+    chatbot.change_language('en')
+    all_symptoms = chatbot.symptoms
+    known_profiles = core.profile_index.row_by_mask
+    for size in range(1, 18):
+        sets = []
+        for row in english_rows:
+            chosen = row[:size]
+            while len(chosen) < size:
+                extra = rng.choice(all_symptoms)
+                if extra not in chosen:
+                    chosen.append(extra)
+            # A training profile is answered by the profile index, so swap a symptom until it is new
+            while core.symptom_mask(chosen) in known_profiles:
+                chosen[-1] = rng.choice([s for s in all_symptoms if s not in chosen])
+            sets.append(chosen)
+        next_set = cycle(sets)
+        # Every call is a cache miss on a new profile, so this times the engine
+        results[f'predict_condition[{size}]'] = measure(
+            lambda: (prediction_cache.clear(), chatbot.predict_condition(next_set())), repeat)
+
+    # The same symptom sets again, now answered from the prediction cache
+    next_set = cycle(sets)
+    results['predict_condition_cached'] = measure(lambda: chatbot.predict_condition(next_set()), repeat)
+
+    print('lookups...', file=sys.stderr)
+    for language in ('en', 'hi', 'te'):
+        chatbot.change_language(language)
+        next_name = cycle(names[language])
+        results[f'get_description[{language}]'] = measure(
+            lambda: chatbot.get_description(next_name()), repeat)
+        results[f'get_precautions[{language}]'] = measure(
+            lambda: chatbot.get_precautions(next_name()), repeat)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'model': core.model_key
+        },
+        'imports': imports,
+        'results': results
+    }
+
+
+def print_imports(imports, top=10):
+    print(f"cold-start imports: {imports['total_us'] / 1000:.1f} ms, "
+          f"training-only packages: {', '.join(imports['heavy']) or 'none'}")
+    for name, us in list(imports['packages'].items())[:top]:
+        print(f"  {name:38} {us / 1000:12.1f} ms")
+
+
+def compare(baseline, current, threshold):
+    """Print a comparison table and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name)
+        if now is None:
+            print(f"{name:40} {base['median_us']:12.1f} {'missing':>12}")
+            continue
+        change = now['median_us'] / base['median_us'] - 1 if base['median_us'] else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:40} {base['median_us']:12.1f} {now['median_us']:12.1f} {change:+8.1%}{flag}")
+    for name in current['results'].keys() - baseline['results'].keys():
+        print(f"{name:40} {'new':>12} {current['results'][name]['median_us']:12.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the chatbot hot paths')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the suite and write a JSON result')
+    run_parser.add_argument('--output', default=BASELINE_FILE)
+    run_parser.add_argument('--repeat', type=int, default=7)
+    run_parser.add_argument('--quick', action='store_true', help='fewer cold-start and training runs')
+
+    compare_parser = subparsers.add_parser('compare', help='compare against a baseline')
+    compare_parser.add_argument('baseline', nargs='?', default=BASELINE_FILE)
+    compare_parser.add_argument('--current', help='saved result to compare instead of running now')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='allowed slowdown of the median, as a fraction')
+    compare_parser.add_argument('--repeat', type=int, default=7)
+    compare_parser.add_argument('--quick', action='store_true')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        result = run_benchmarks(args.repeat, args.quick)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        for name, stats in result['results'].items():
+            print(f"{name:40} {stats['median_us']:12.1f} us")
+        print_imports(result['imports'])
+        print(f"Wrote {args.output}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(args.repeat, args.quick)
+    regressions = compare(baseline, current, args.threshold)
+    if 'imports' in current:
+        print_imports(current['imports'])
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}")
+        sys.exit(1)
+    print('No regressions')
+
+
+if __name__ == "__main__":
+    main()
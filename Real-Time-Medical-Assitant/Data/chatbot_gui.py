@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from model import MedicalChatbot
+from gui_worker import InferenceWorker
 
 class ChatbotGUI:
     def __init__(self, root):
@@ -16,7 +17,8 @@ class ChatbotGUI:
                 'enter_symptoms': 'Enter your symptoms:',
                 'send': 'Send',
                 'clear': 'Clear',
-                'start_over': 'Start Over'
+                'start_over': 'Start Over',
+                'working': 'Working...'
             },
             'hi': {
                 'title': 'चिकित्सा सहायक',
@@ -25,7 +27,8 @@ class ChatbotGUI:
                 'enter_symptoms': 'अपने लक्षण दर्ज करें:',
                 'send': 'भेजें',
                 'clear': 'साफ़ करें',
-                'start_over': 'फिर से शुरू करें'
+                'start_over': 'फिर से शुरू करें',
+                'working': 'काम चल रहा है...'
             },
             'te': {
                 'title': 'వైద్య సహాయకుడు',
@@ -34,7 +37,8 @@ class ChatbotGUI:
                 'enter_symptoms': 'మీ లక్షణాలను నమోదు చేయండి:',
                 'send': 'పంపండి',
                 'clear': 'క్లియర్',
-                'start_over': 'మళ్ళీ ప్రారంభించండి'
+                'start_over': 'మళ్ళీ ప్రారంభించండి',
+                'working': 'పని జరుగుతోంది...'
             }
         }
         
@@ -55,8 +59,8 @@ class ChatbotGUI:
         ttk.Radiobutton(self.lang_frame, text="తెలుగు", variable=self.lang_var, 
                        value='te', command=self.change_language).pack(side=tk.LEFT)
         
-        # Initialize chatbot with default language
-        self.chatbot = MedicalChatbot(language='en')
+        # The chatbot is only used on the worker thread, so loading it never blocks the window
+        self.chatbot = None
         self.current_symptoms = []
         
         # Create chat display
@@ -94,15 +98,54 @@ class ChatbotGUI:
                                           command=self.start_over)
         self.start_over_button.pack(side=tk.LEFT, padx=5)
         
+        # Busy indicator, shown while the worker has requests in flight
+        self.status_frame = ttk.Frame(root)
+        self.status_frame.pack(padx=10, pady=(0, 5), fill=tk.X)
+        
+        self.status_label = ttk.Label(self.status_frame, text='')
+        self.status_label.pack(side=tk.LEFT)
+        
+        self.progress = ttk.Progressbar(self.status_frame, mode='indeterminate', length=120)
+        
         # Display welcome message
         self.display_bot_message(self.ui_text['en']['welcome'])
+        
+        # Warm the model up in the background; input typed meanwhile queues behind it
+        self.worker = InferenceWorker(root, on_busy=self.set_busy)
+        self.worker.submit(self.load_chatbot, on_error=self.show_error)
+
+    def load_chatbot(self):
+        """Build the chatbot (worker thread)"""
+        self.chatbot = MedicalChatbot(language='en')
+
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        if busy:
+            self.status_label.config(text=self.ui_text[self.lang_var.get()]['working'])
+            self.progress.pack(side=tk.RIGHT)
+            self.progress.start(15)
+        else:
+            self.status_label.config(text='')
+            self.progress.stop()
+            self.progress.pack_forget()
+
+    def show_error(self, error):
+        """Report a failed background request in the chat"""
+        self.display_bot_message(f"Error: {str(error)}")
+
+    def cancel_pending(self):
+        """Drop queued extractions and predictions whose answers are no longer wanted"""
+        self.worker.cancel('input')
+        self.worker.cancel('prediction')
 
     def change_language(self):
         """Change the interface language"""
         lang = self.lang_var.get()
         
-        # Update chatbot language
-        self.chatbot = MedicalChatbot(language=lang)
+        # Switch the existing chatbot; the trained model is shared across languages.
+        # Answers still pending in the old language are stale, the switch itself always runs
+        self.cancel_pending()
+        self.worker.submit(lambda: self.chatbot.change_language(lang), on_error=self.show_error)
         
         # Update UI text
         self.root.title(self.ui_text[lang]['title'])
@@ -110,6 +153,8 @@ class ChatbotGUI:
         self.send_button.config(text=self.ui_text[lang]['send'])
         self.clear_button.config(text=self.ui_text[lang]['clear'])
         self.start_over_button.config(text=self.ui_text[lang]['start_over'])
+        if self.worker.busy:
+            self.status_label.config(text=self.ui_text[lang]['working'])
         
         # Clear chat and show welcome message in new language
         self.chat_display.delete(1.0, tk.END)
@@ -133,10 +178,15 @@ class ChatbotGUI:
             self.make_prediction()
             return
         
-        # Extract symptoms from input
-        new_symptoms = self.chatbot.extract_symptoms_from_text(user_input)
+        # Extract symptoms from input on the worker
+        self.worker.submit(lambda: self.chatbot.extract_symptoms_from_text(user_input),
+                           on_done=self.add_symptoms, on_error=self.show_error, group='input')
+
+    def add_symptoms(self, new_symptoms):
+        """Take the symptoms extracted from one message"""
         if new_symptoms:
-            self.current_symptoms.extend(new_symptoms)
+            # Symptoms repeated across messages are only counted once
+            self.current_symptoms.extend(s for s in new_symptoms if s not in self.current_symptoms)
             self.make_prediction()
         else:
             self.display_bot_message(self.get_language_text('no_symptoms_found'))
@@ -169,6 +219,7 @@ class ChatbotGUI:
 
     def clear_symptoms(self):
         """Clear current symptoms"""
+        self.cancel_pending()
         self.current_symptoms = []
         self.display_bot_message(self.ui_text[self.lang_var.get()]['welcome'])
 
@@ -184,13 +235,21 @@ class ChatbotGUI:
             self.display_bot_message(self.get_language_text('no_symptoms_found'))
             return
         
-        predictions = self.chatbot.predict_condition(self.current_symptoms)
+        # A newer message supersedes a prediction that has not been shown yet
+        self.worker.submit(self.build_report, list(self.current_symptoms), self.lang_var.get(),
+                           on_done=self.show_report, on_error=self.show_error,
+                           group='prediction', supersede=True)
+
+    def build_report(self, symptoms, lang):
+        """Predict and format the result message (worker thread)"""
+        # One engine call feeds the predictions, triage and follow-up questions
+        scores = self.chatbot.condition_scores(symptoms)
+        predictions = self.chatbot.rank_conditions(scores, 3)
         
         # Get the top prediction
         main_condition, main_confidence = predictions[0]
         
         # Format the prediction message
-        lang = self.lang_var.get()
         result = "\n" + "=" * 40 + "\n\n"
         
         # Show top 3 predictions with confidence
@@ -204,6 +263,20 @@ class ChatbotGUI:
         for condition, confidence in predictions:
             result += f"• {condition} ({confidence:.1f}%)\n"
         
+        # Urgency from the symptoms' severity weights and the likely conditions
+        triage = self.chatbot.assess_triage(symptoms, scores=scores)
+        tier_texts = {
+            'en': {'low': "Low", 'moderate': "Moderate", 'high': "High - please see a doctor soon"},
+            'hi': {'low': "कम", 'moderate': "मध्यम", 'high': "उच्च - कृपया जल्द डॉक्टर से मिलें"},
+            'te': {'low': "తక్కువ", 'moderate': "మధ్యస్థం", 'high': "అధికం - దయచేసి త్వరగా వైద్యుడిని సంప్రదించండి"}
+        }
+        urgency_texts = {
+            'en': "Urgency",
+            'hi': "तात्कालिकता",
+            'te': "అత్యవసరత"
+        }
+        result += f"\n{urgency_texts[lang]}: {tier_texts[lang][triage['tier']]} ({triage['score'] * 100:.0f}/100)\n"
+        
         result += "\n" + "=" * 40 + "\n"
         
         # Add warning for low confidence
@@ -214,6 +287,17 @@ class ChatbotGUI:
                 'te': "⚠️ హెచ్చరిక: తక్కువ విశ్వసనీయత అంచనా. దయచేసి మరింత ఖచ్చితమైన రోగనిర్ధారణ కోసం మరిన్ని లక్షణాలను అందించండి."
             }
             result += f"\n{warning_texts[lang]}\n"
+            
+            # Name the symptoms that would best tell the top conditions apart
+            suggestions = self.chatbot.suggest_symptoms(symptoms, scores=scores)
+            if suggestions:
+                names = ", ".join(self.chatbot.symptom_names[s] for s in suggestions)
+                question_texts = {
+                    'en': f"To narrow it down, do you also have: {names}?",
+                    'hi': f"निदान को सटीक बनाने के लिए, क्या आपको यह भी है: {names}?",
+                    'te': f"నిర్ధారణను మరింత స్పష్టం చేయడానికి, మీకు ఇవి కూడా ఉన్నాయా: {names}?"
+                }
+                result += f"{question_texts[lang]}\n"
         
         # Get description and precautions
         description = self.chatbot.get_description(main_condition)
@@ -233,6 +317,11 @@ class ChatbotGUI:
         for i, precaution in enumerate(precautions, 1):
             result += f"{i}. {precaution}\n"
         
+        return result, main_confidence, lang
+
+    def show_report(self, report):
+        """Display a finished prediction"""
+        result, main_confidence, lang = report
         self.display_bot_message(result)
         
         # Prompt for more symptoms if confidence is low
@@ -255,6 +344,7 @@ def main():
     root = tk.Tk()
     app = ChatbotGUI(root)
     root.mainloop()
+    app.worker.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
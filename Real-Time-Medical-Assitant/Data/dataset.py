@@ -0,0 +1,221 @@
+"""Columnar binary cache for the symptom CSVs.
+
+Training.csv and the testing files are 0/1 symptom columns plus a label
+column. Parsing them with pandas gives int64 columns, 8 bytes per flag.
+load_dataset converts a CSV once into Data/cache as a uint8 .npy matrix,
+a label .npy and a JSON header. Later loads memory-map the matrix with no
+copy, so every worker process shares the same page-cache pages.
+
+The header records the source size, mtime and SHA-256. If the size or
+mtime changes, the file is hashed again and the cache is rebuilt only if
+the content really changed. Data files carry the content digest in their
+names and the header is replaced last, so a reader never pairs a new
+header with an old matrix.
+
+pandas is only imported to build a cache or a DataFrame, so loading a
+current cache needs nothing beyond NumPy.
+
+    python Data/dataset.py Data/Training.csv Data/Testing.csv    # prebuild
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+CACHE_DIR = 'Data/cache'
+CACHE_FORMAT = 1
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Dataset:
+    """Binary symptom matrix with its column names and labels"""
+
+    def __init__(self, X, labels, symptoms, label_column, digest):
+        self.X = X                      # (n_rows, n_symptoms) uint8, usually memory-mapped
+        self.labels = labels            # (n_rows,) label strings
+        self.symptoms = symptoms
+        self.label_column = label_column
+        self.digest = digest            # SHA-256 of the source CSV
+
+    def __len__(self):
+        return len(self.labels)
+
+    def frame(self):
+        """The data as a DataFrame shaped like pd.read_csv output, with uint8 symptom columns"""
+        import pandas as pd
+        df = pd.DataFrame(self.X, columns=self.symptoms)
+        df[self.label_column] = self.labels.astype(object)
+        return df
+
+
+def cache_paths(source_path, cache_dir, digest=None):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    header = os.path.join(cache_dir, f'{stem}.json')
+    if digest is None:
+        return header, None, None
+    prefix = os.path.join(cache_dir, f'{stem}-{digest[:16]}')
+    return header, f'{prefix}.X.npy', f'{prefix}.labels.npy'
+
+
+def read_header(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return header if header.get('format') == CACHE_FORMAT else None
+
+
+def write_atomic(path, write):
+    """Write through a temp file in the same directory, then rename into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_cache(source_path, cache_dir, digest, stat):
+    """Parse the CSV and write the matrix, labels and header; returns the header"""
+    import pandas as pd
+    df = pd.read_csv(source_path)
+    symptoms = list(df.columns[:-1])
+    label_column = df.columns[-1]
+    values = df[symptoms].to_numpy()
+    if values.size and (values.min() < 0 or values.max() > 1):
+        raise ValueError(f'{source_path}: symptom columns must be binary')
+
+    os.makedirs(cache_dir, exist_ok=True)
+    header_path, matrix_path, labels_path = cache_paths(source_path, cache_dir, digest)
+    save_array(matrix_path, values.astype(np.uint8))
+    save_array(labels_path, df[label_column].to_numpy(dtype=str))
+
+    header = {
+        'format': CACHE_FORMAT,
+        'source': os.path.basename(source_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest,
+        'rows': len(df),
+        'symptoms': symptoms,
+        'label_column': label_column,
+        'matrix': os.path.basename(matrix_path),
+        'labels': os.path.basename(labels_path)
+    }
+    save_header(header_path, header)
+
+    # Older generations are no longer referenced; open memory maps keep their data alive
+    for path in glob.glob(os.path.join(cache_dir, f"{os.path.splitext(header['source'])[0]}-*.npy")):
+        if os.path.basename(path) not in (header['matrix'], header['labels']):
+            os.remove(path)
+    return header
+
+
+def save_array(path, array):
+    def write(tmp_path):
+        # Through a file handle, since np.save would add .npy to the temp name
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+    write_atomic(path, write)
+
+
+def save_header(path, header):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False)
+    write_atomic(path, write)
+
+
+def open_cache(cache_dir, header):
+    """Memory-map the matrix a header points to and read its labels"""
+    X = np.load(os.path.join(cache_dir, header['matrix']), mmap_mode='r')
+    labels = np.load(os.path.join(cache_dir, header['labels']))
+    return Dataset(X, labels, header['symptoms'], header['label_column'], header['sha256'])
+
+
+def load_dataset(source_path, cache_dir=CACHE_DIR, force=False):
+    """Load a symptom CSV through the binary cache, rebuilding it when the source changed"""
+    stat = os.stat(source_path)
+    header_path = cache_paths(source_path, cache_dir)[0]
+    header = None if force else read_header(header_path)
+
+    if header is not None and (header['size'], header['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+        # Touched but maybe not edited (checkout, copy): compare content before rebuilding
+        if file_digest(source_path) == header['sha256']:
+            header = dict(header, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            try:
+                save_header(header_path, header)
+            except OSError:
+                pass
+        else:
+            header = None
+
+    if header is not None:
+        try:
+            return open_cache(cache_dir, header)
+        except (OSError, ValueError):
+            pass
+
+    digest = file_digest(source_path)
+    try:
+        header = build_cache(source_path, cache_dir, digest, stat)
+    except OSError as e:
+        print(f"Could not write dataset cache: {str(e)}")
+        import pandas as pd
+        df = pd.read_csv(source_path)
+        symptoms = list(df.columns[:-1])
+        return Dataset(df[symptoms].to_numpy(dtype=np.uint8), df[df.columns[-1]].to_numpy(dtype=str),
+                       symptoms, df.columns[-1], digest)
+    return open_cache(cache_dir, header)
+
+
+def read_table(path):
+    """Rows of a small CSV table as dicts, read like pd.read_csv(on_bad_lines='skip').
+
+    Rows with more fields than the header are skipped, missing and empty
+    fields are None.
+    """
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader, [])
+        rows = []
+        for fields in reader:
+            if not fields or len(fields) > len(columns):
+                continue
+            fields = [field if field != '' else None for field in fields]
+            fields += [None] * (len(columns) - len(fields))
+            rows.append(dict(zip(columns, fields)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the binary cache for symptom CSVs')
+    parser.add_argument('sources', nargs='*', default=['Data/Training.csv', 'Data/Testing.csv'])
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the cache is current')
+    args = parser.parse_args()
+
+    for source in args.sources:
+        dataset = load_dataset(source, args.cache_dir, force=args.force)
+        print(f"{source}: {len(dataset)} rows x {len(dataset.symptoms)} symptoms, "
+              f"{dataset.X.nbytes / 1024:.1f} KiB as uint8")
+
+
+if __name__ == "__main__":
+    main()
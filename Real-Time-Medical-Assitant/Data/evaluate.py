@@ -0,0 +1,268 @@
+"""Accuracy and latency of every inference backend.
+
+Scores each backend on Data/Testing.csv. The whole test set goes through
+one predict_proba call. Full test rows are used as given. Partial rows
+keep a random half of each row's symptoms, which is closer to what users
+actually type. Each backend reports top-1 and top-3 accuracy, and a
+confusion matrix of its top-1 answers on the partial rows. Latency is
+measured on the uncached engine path, one query at a time and as one
+batch. Single queries are timed one by one, so p50/p90/p99 come from
+the real distribution.
+
+The text pipeline is then run end to end in Hindi. Each row of
+Data/Testing_hindi.csv is rendered as free text from the Hindi lexicon
+phrases, then run through extract_symptoms_from_text and
+predict_condition. That file translates Testing.csv row by row, so the
+true class comes from the English row.
+
+Results are checked against Data/evaluation_thresholds.json. The run
+exits with status 1 if any accuracy or throughput figure is below its
+recorded minimum. --write-thresholds records new minimums from the
+current run, with some slack:
+
+    python Data/evaluate.py
+    python Data/evaluate.py --backends forest jaccard --output eval.json
+    python Data/evaluate.py --write-thresholds Data/evaluation_thresholds.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from backends import BACKENDS
+from benchmark import TESTING_HINDI_FILE, measure, render_text
+from dataset import load_dataset
+from forest_engine import top_k, top_k_rows
+from model import ChatbotCore, MedicalChatbot, normalize_disease_name, prediction_cache
+
+TESTING_FILE = 'Data/Testing.csv'
+THRESHOLDS_FILE = 'Data/evaluation_thresholds.json'
+PERCENTILES = (50, 90, 99)
+
+# How far below the current run --write-thresholds puts each minimum
+ACCURACY_SLACK = 0.02
+THROUGHPUT_SLACK = 0.5
+
+
+def topk_accuracy(proba, labels, k):
+    """Fraction of rows whose label is among the k highest-scoring classes"""
+    top = top_k_rows(proba, k)
+    return float(np.mean((top == labels[:, None]).any(axis=1)))
+
+
+def confusion_matrix(labels, predicted, n_classes):
+    """counts[true, predicted] over all rows"""
+    counts = np.bincount(labels * n_classes + predicted, minlength=n_classes * n_classes)
+    return counts.reshape(n_classes, n_classes)
+
+
+def confused_pairs(confusion, classes, top=5):
+    """The most frequent (true, predicted, count) mistakes"""
+    errors = confusion.copy()
+    np.fill_diagonal(errors, 0)
+    order = np.argsort(errors, axis=None)[::-1][:top]
+    return [(classes[i], classes[j], int(errors[i, j]))
+            for i, j in zip(*np.unravel_index(order, errors.shape)) if errors[i, j]]
+
+
+def time_calls(func, inputs, repeat=5):
+    """Microseconds of every func(item) call over repeat passes of inputs"""
+    func(inputs[0])
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return np.array(samples)
+
+
+def latency_summary(samples):
+    """Percentiles and throughput of per-call samples in microseconds"""
+    summary = {f'p{p}_us': float(v) for p, v in zip(PERCENTILES, np.percentile(samples, PERCENTILES))}
+    summary['per_s'] = float(len(samples) / (samples.sum() / 1e6))
+    return summary
+
+
+def evaluate_backend(core, name, X, labels, X_partial, repeat=5):
+    engine = core.backend(name)
+    proba = engine.predict_proba(X)
+    proba_partial = engine.predict_proba(X_partial)
+
+    queries = [np.flatnonzero(row) for row in X_partial]
+    single = latency_summary(time_calls(lambda active: top_k(engine.predict_proba_active(active), 3),
+                                        queries, repeat))
+    batch = measure(lambda: top_k_rows(engine.predict_proba(X_partial), 3), repeat)
+    confusion = confusion_matrix(labels, proba_partial.argmax(axis=1), proba.shape[1])
+
+    return {
+        'top1': topk_accuracy(proba, labels, 1),
+        'top3': topk_accuracy(proba, labels, 3),
+        'partial_top1': topk_accuracy(proba_partial, labels, 1),
+        'partial_top3': topk_accuracy(proba_partial, labels, 3),
+        'single_us': single['p50_us'],
+        'single_p90_us': single['p90_us'],
+        'single_p99_us': single['p99_us'],
+        'single_per_s': single['per_s'],
+        'batch_row_us': batch['median_us'] / len(X_partial),
+        'batch_rows_per_s': len(X_partial) / (batch['median_us'] / 1e6),
+        'confusion': confusion.tolist()
+    }
+
+
+def evaluate_text_pipeline(core, labels, path=TESTING_HINDI_FILE, language='hi', rounds=5, seed=42):
+    """Free text -> extracted symptoms -> top-3 conditions, scored against labels"""
+    testing = load_dataset(path)
+    rows = [[testing.symptoms[i] for i in np.flatnonzero(row)] for row in testing.X]
+    chatbot = MedicalChatbot(language=language, core=core)
+    # Display names can repeat across classes; any class with the right name counts
+    name_classes = {}
+    for i, name in enumerate(chatbot.condition_names):
+        name_classes.setdefault(name, set()).add(i)
+
+    rng = random.Random(seed)
+    # Build the phrase matchers and profile index before timing starts
+    chatbot.predict_condition(chatbot.extract_symptoms_from_text(' '.join(chatbot.symptom_mapping)))
+    top1 = top3 = exact = 0
+    samples = []
+    for _ in range(rounds):
+        for text, row, label in zip(render_text(chatbot, rows, rng), rows, labels):
+            # Every text is timed cold, as a first turn would be
+            prediction_cache.clear()
+            start = time.perf_counter()
+            symptoms = chatbot.extract_symptoms_from_text(text)
+            predictions = chatbot.predict_condition(symptoms) if symptoms else []
+            samples.append((time.perf_counter() - start) * 1e6)
+
+            exact += set(symptoms) == set(row)
+            hits = [label in name_classes[name] for name, _ in predictions]
+            top1 += any(hits[:1])
+            top3 += any(hits)
+
+    count = len(samples)
+    return dict({
+        'language': language,
+        'texts': count,
+        'extraction_exact': exact / count,
+        'top1': top1 / count,
+        'top3': top3 / count
+    }, **latency_summary(np.array(samples)))
+
+
+def check_thresholds(results, thresholds):
+    """Messages for every recorded minimum the results fall below"""
+    failures = []
+    for section, minimums in thresholds.items():
+        for name, limits in minimums.items():
+            result = results.get(section, {}).get(name)
+            if result is None:
+                continue
+            for metric, minimum in limits.items():
+                if result[metric] < minimum:
+                    failures.append(f"{section}.{name}.{metric}: {result[metric]:.4g} < {minimum:.4g}")
+    return failures
+
+
+def record_thresholds(results):
+    """Minimums a little below the current results, for the metrics worth gating on"""
+    def limits(result, accuracy, throughput):
+        recorded = {m: round(max(0.0, result[m] - ACCURACY_SLACK), 3) for m in accuracy}
+        recorded.update({m: round(result[m] * THROUGHPUT_SLACK) for m in throughput})
+        return recorded
+
+    return {
+        'backends': {
+            name: limits(result, ('top1', 'top3', 'partial_top1', 'partial_top3'),
+                         ('single_per_s', 'batch_rows_per_s'))
+            for name, result in results['backends'].items()
+        },
+        'text_pipeline': {
+            name: limits(result, ('extraction_exact', 'top1', 'top3'), ('per_s',))
+            for name, result in results['text_pipeline'].items()
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare inference backends on the test set')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--testing', default=TESTING_FILE)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='renderings of each Hindi test row for the text pipeline')
+    parser.add_argument('--thresholds', default=THRESHOLDS_FILE,
+                        help="minimums to check against; 'none' to skip the check")
+    parser.add_argument('--write-thresholds', metavar='PATH',
+                        help='record minimums from this run instead of checking')
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    core = ChatbotCore.shared()
+    testing = load_dataset(args.testing)
+    columns = [core.symptom_index[s] for s in testing.symptoms]
+    X = np.zeros((len(testing), len(core.symptoms)), dtype=np.uint8)
+    X[:, columns] = testing.X
+
+    class_index = {normalize_disease_name(c): i for i, c in enumerate(core.classes)}
+    labels = np.array([class_index[normalize_disease_name(label)] for label in testing.labels])
+
+    rng = np.random.default_rng(args.seed)
+    X_partial = X & (rng.random(X.shape) < 0.5)
+    # Keep at least one symptom per row so every query says something
+    for row, full in zip(X_partial, X):
+        if not row.any():
+            row[rng.choice(np.flatnonzero(full))] = 1
+
+    results = {'backends': {}, 'text_pipeline': {}}
+    print(f"{'backend':12} {'top1':>6} {'top3':>6} {'part@1':>7} {'part@3':>7} "
+          f"{'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'batch us/row':>13}")
+    for name in args.backends:
+        result = results['backends'][name] = evaluate_backend(core, name, X, labels, X_partial, args.repeat)
+        print(f"{name:12} {result['top1']:6.3f} {result['top3']:6.3f} "
+              f"{result['partial_top1']:7.3f} {result['partial_top3']:7.3f} "
+              f"{result['single_us']:8.1f} {result['single_p90_us']:8.1f} {result['single_p99_us']:8.1f} "
+              f"{result['batch_row_us']:13.2f}")
+    for name in args.backends:
+        pairs = confused_pairs(np.array(results['backends'][name]['confusion']), core.classes)
+        if pairs:
+            print(f"{name} partial-row confusions: "
+                  + ', '.join(f"{true} -> {predicted} ({count})" for true, predicted, count in pairs))
+
+    print('text pipeline...', file=sys.stderr)
+    pipeline = results['text_pipeline']['hi'] = evaluate_text_pipeline(
+        core, labels, rounds=args.rounds, seed=args.seed)
+    print(f"text pipeline [hi] {pipeline['texts']} texts: extraction exact {pipeline['extraction_exact']:.3f}, "
+          f"top1 {pipeline['top1']:.3f}, top3 {pipeline['top3']:.3f}, "
+          f"p50 {pipeline['p50_us']:.1f} us, p90 {pipeline['p90_us']:.1f} us, "
+          f"p99 {pipeline['p99_us']:.1f} us, {pipeline['per_s']:.0f} texts/s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'model': core.model_key, 'rows': len(labels), 'classes': list(core.classes),
+                       'results': results}, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.write_thresholds:
+        with open(args.write_thresholds, 'w', encoding='utf-8') as f:
+            json.dump(record_thresholds(results), f, indent=2)
+            f.write('\n')
+        print(f"Wrote {args.write_thresholds}")
+        return
+
+    if args.thresholds != 'none':
+        with open(args.thresholds, encoding='utf-8') as f:
+            failures = check_thresholds(results, json.load(f))
+        if failures:
+            print(f"{len(failures)} metric(s) below threshold:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print('All thresholds met')
+
+
+if __name__ == "__main__":
+    main()
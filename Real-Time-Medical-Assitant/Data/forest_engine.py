@@ -0,0 +1,263 @@
+"""Pure-NumPy inference for a fitted RandomForestClassifier.
+
+The trees are flattened into one set of node arrays so every tree is walked
+at once with a few vectorized gathers per depth level, instead of going
+through sklearn's per-call validation and per-tree dispatch. Probabilities
+are summed in the same order as sklearn, so they match it bit for bit.
+
+Symptom rows are 0/1 and sparse: a few set features out of 132, while a
+root-to-leaf path is about 29 nodes long. Most steps of a path therefore
+follow the branch for an absent feature. For 0/1 batches, apply_binary
+precomputes that absent-branch chain from every node where a path can
+start: the roots, and each node's branch for a present feature. It
+records the position at which each feature is tested on the chain. A
+(row, tree) pair then jumps straight to the first chain node that tests
+one of the row's set features, takes the present branch, and repeats.
+That costs about one step per set feature instead of one per depth
+level. Rows are processed in order of their number of set features, in
+chunks padded to the chunk's widest row. Duplicate rows are walked once.
+"""
+import numpy as np
+
+# Below this many rows the per-row sparse walk beats the fixed cost of a batched walk
+SPARSE_BATCH_LIMIT = 16
+
+# Rows per chunk of the batched chain walk; keeps its per-pair arrays in cache
+CHAIN_CHUNK = 256
+
+# Everything inference needs; saved and restored by to_arrays and from_arrays
+ARRAYS = ('feature', 'threshold', 'leaf_proba', 'is_leaf', 'roots', 'children',
+          'absent_next', 'present_nodes', 'present_next', 'present_ptr')
+SCALARS = ('n_trees', 'n_features', 'n_classes', 'max_depth')
+
+
+class CompiledForest:
+    def __init__(self, forest):
+        """Compile the fitted trees of a sklearn forest into flat node arrays"""
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        self.n_trees = len(trees)
+        self.n_features = forest.n_features_in_
+        self.n_classes = forest.n_classes_
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        roots = np.zeros(self.n_trees, dtype=np.intp)
+        offset = 0
+        max_depth = 0
+        for i, tree in enumerate(trees):
+            n_nodes = tree.node_count
+            left = tree.children_left.astype(np.intp)
+            is_leaf = left < 0
+            node_ids = np.arange(n_nodes, dtype=np.intp)
+
+            # Leaves point to themselves so finished trees stay put while deeper ones advance
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+
+            # Same per-leaf normalization as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :self.n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots[i] = offset
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        left = np.concatenate(lefts)
+        right = np.concatenate(rights)
+        self.leaf_proba = np.concatenate(values)
+        self.is_leaf = np.isinf(self.threshold)
+        self.roots = roots
+        self.max_depth = max_depth
+
+        # Interleaved children so one gather picks the branch: children[2 * node + go_right]
+        self.children = np.stack([left, right], axis=1).ravel()
+
+        # Successor of every node for an all-zero input, plus per-feature overrides
+        # for features set to one. Used by the sparse single-query path.
+        self.absent_next = np.where(0 <= self.threshold, left, right)
+        internal = np.flatnonzero(np.isfinite(self.threshold))
+        by_feature = internal[np.argsort(self.feature[internal], kind='stable')]
+        self.present_nodes = by_feature
+        self.present_next = np.where(1 <= self.threshold[by_feature],
+                                     left[by_feature], right[by_feature])
+        self.present_ptr = np.searchsorted(self.feature[by_feature],
+                                           np.arange(self.n_features + 1))
+        self._chains = None
+
+    def to_arrays(self):
+        """The compiled forest as a flat {name: array} dict, e.g. for np.savez"""
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+        arrays.update((name, np.asarray(getattr(self, name))) for name in SCALARS)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a compiled forest from to_arrays output, without scikit-learn"""
+        forest = cls.__new__(cls)
+        for name in ARRAYS:
+            setattr(forest, name, np.asarray(arrays[name]))
+        for name in SCALARS:
+            setattr(forest, name, int(arrays[name]))
+        forest._chains = None
+        return forest
+
+    def chains(self):
+        """Absent-branch chains for apply_binary, built on first use.
+
+        Returns (head_of, present_child, chain, position). Chain heads are
+        the roots and every internal node's present-feature branch;
+        head_of maps a node to its head number, or -1. chain[h, i] is the
+        node i steps down head h's chain, repeating the leaf it ends in.
+        position is a flat (n_features + 1, n_heads) table: the chain
+        step at which head h tests feature f, or the last step (its leaf)
+        if it does not. The extra feature row is never tested and pads
+        short rows.
+        """
+        if self._chains is None:
+            internal = np.flatnonzero(~self.is_leaf)
+            left, right = self.children[0::2], self.children[1::2]
+            present_child = np.where(1 <= self.threshold, left, right)
+            heads = np.concatenate([self.roots, present_child[internal]])
+            n_heads, length = heads.size, self.max_depth + 1
+
+            head_of = np.full(self.feature.size, -1, dtype=np.intp)
+            head_of[heads] = np.arange(n_heads)
+            chain = np.empty((n_heads, length), dtype=np.int32)
+            position = np.full((self.n_features + 1, n_heads), length - 1, dtype=np.uint8)
+            nodes, head_ids = heads, np.arange(n_heads)
+            for step in range(length):
+                chain[:, step] = nodes
+                inside = ~self.is_leaf[nodes]
+                # A 0/1 feature is tested at most once on a path, so each cell is set once
+                position[self.feature[nodes[inside]], head_ids[inside]] = step
+                nodes = self.absent_next[nodes]
+            self._chains = head_of, present_child, chain.ravel(), position.ravel()
+        return self._chains
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_samples, n_trees)"""
+        X = np.ascontiguousarray(X)
+        n_samples, n_features = X.shape
+        flat = X.ravel()
+        leaves = np.tile(self.roots, n_samples)
+
+        # Walk (sample, tree) pairs still inside a tree; most reach a leaf well
+        # before max_depth, so finished pairs are dropped every few levels
+        position = np.arange(leaves.size)
+        nodes = leaves.copy()
+        row_base = np.repeat(np.arange(n_samples) * n_features, self.n_trees)
+        for depth in range(1, self.max_depth + 1):
+            go_right = flat[row_base + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+            if depth % 4 == 0:
+                done = self.is_leaf[nodes]
+                leaves[position[done]] = nodes[done]
+                active = ~done
+                position, nodes, row_base = position[active], nodes[active], row_base[active]
+                if not position.size:
+                    break
+        leaves[position] = nodes
+        return leaves.reshape(n_samples, self.n_trees)
+
+    def apply_binary(self, X):
+        """apply for a 0/1 matrix, walking the absent-branch chains instead of every level"""
+        X = np.asarray(X)
+        counts = np.count_nonzero(X, axis=1)
+        order = np.argsort(counts, kind='stable')
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.intp)
+        for start in range(0, X.shape[0], CHAIN_CHUNK):
+            rows = order[start:start + CHAIN_CHUNK]
+            leaves[rows] = self._walk_chains(X[rows], counts[rows])
+        return leaves
+
+    def _walk_chains(self, X, counts):
+        """Leaves for a chunk of 0/1 rows, each row's set features given by counts"""
+        head_of, present_child, chain, position = self.chains()
+        n_heads = position.size // (self.n_features + 1)
+        length = self.max_depth + 1
+
+        # Set feature indices per row, padded with the never-tested extra feature
+        width = max(1, int(counts.max()))
+        active = np.full((X.shape[0], width), self.n_features, dtype=np.intp)
+        row_ids, features = np.nonzero(X)
+        active[row_ids, np.arange(features.size) - np.repeat(np.cumsum(counts) - counts, counts)] = features
+        columns = [active[:, j] * n_heads for j in range(width)]
+
+        leaves = np.empty(X.shape[0] * self.n_trees, dtype=np.intp)
+        pair = np.arange(leaves.size)
+        rows = pair // self.n_trees
+        heads = np.tile(np.arange(self.n_trees), X.shape[0])
+        while pair.size:
+            # First step on the chain that tests one of the row's set features
+            step = position.take(columns[0][rows] + heads)
+            for column in columns[1:]:
+                np.minimum(step, position.take(column[rows] + heads), out=step)
+            nodes = chain.take(heads * length + step)
+            done = self.is_leaf[nodes]
+            leaves[pair[done]] = nodes[done]
+            more = ~done
+            pair, rows = pair[more], rows[more]
+            heads = head_of[present_child[nodes[more]]]
+        return leaves.reshape(X.shape[0], self.n_trees)
+
+    def predict_proba(self, X):
+        """Class probabilities for a dense (n_samples, n_features) matrix"""
+        X = np.asarray(X)
+        if not ((X == 0) | (X == 1)).all():
+            return self._accumulate(self.apply(X))
+        if X.shape[0] <= SPARSE_BATCH_LIMIT:
+            rows = [self.predict_proba_active(np.flatnonzero(row)) for row in X]
+            return np.array(rows).reshape(len(rows), self.n_classes)
+
+        # Walk each distinct row once
+        packed = np.ascontiguousarray(np.packbits(X.astype(bool), axis=1))
+        keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        return self._accumulate(self.apply_binary(X[first]))[inverse.ravel()]
+
+    def _accumulate(self, leaves):
+        proba = np.zeros((leaves.shape[0], self.n_classes))
+        for t in range(self.n_trees):
+            proba += self.leaf_proba[leaves[:, t]]
+        proba /= self.n_trees
+        return proba
+
+    def predict_proba_active(self, active):
+        """Class probabilities for one binary input given the indices of its set features"""
+        successor = self.absent_next.copy()
+        for feature in active:
+            start, end = self.present_ptr[feature], self.present_ptr[feature + 1]
+            successor[self.present_nodes[start:end]] = self.present_next[start:end]
+
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = successor[nodes]
+        return self.leaf_proba[nodes].sum(axis=0) / self.n_trees
+
+
+def top_k(proba, k=3):
+    """Return the indices of the k largest probabilities, highest first.
+
+    Ties resolve to the higher class index, which is what a stable
+    ``argsort()[-k:][::-1]`` gives.
+    """
+    n = proba.shape[-1]
+    k = min(k, n)
+    kth = proba[np.argpartition(proba, n - k)[n - k]]
+    candidates = np.flatnonzero(proba >= kth)
+    order = np.lexsort((-candidates, -proba[candidates]))
+    return candidates[order[:k]]
+
+
+def top_k_rows(proba, k=3):
+    """Row-wise top_k for a (n_samples, n_classes) matrix, with the same tie-break"""
+    n_classes = proba.shape[1]
+    k = min(k, n_classes)
+    # A stable sort over the reversed columns puts the higher class index first on ties
+    order = np.argsort(-proba[:, ::-1], axis=1, kind='stable')[:, :k]
+    return n_classes - 1 - order
@@ -0,0 +1,132 @@
+"""Typo-tolerant symptom phrase lookup.
+
+The exact matcher misses "hedache" or "vomitting". Comparing the input to
+every phrase by edit distance would cost O(vocabulary x length^2) per
+turn, so each language's phrases get an inverted index of padded
+character trigrams instead. A query only counts the phrases it shares
+trigrams with. One edit (insert, delete, substitute or swap two adjacent
+characters) removes at most four of the query's trigrams, so a phrase
+that shares fewer than len(trigrams) - 4 * distance of them cannot be
+close enough and is skipped without computing the distance. The few
+phrases left are checked with a bounded edit distance that stops as soon
+as a row of the table exceeds the limit.
+"""
+from collections import Counter
+from itertools import chain
+
+# Pads both ends of a string so its first and last characters get their own trigrams
+PAD = '\x01'
+
+MAX_DISTANCE = 2
+
+# Each allowed edit needs this many characters of input, so short words only match exactly
+CHARS_PER_EDIT = 4
+
+
+def trigrams(text):
+    """Distinct padded character trigrams of text"""
+    padded = f'{PAD}{PAD}{text}{PAD}{PAD}'
+    return {padded[i:i + 3] for i in range(len(text) + 2)}
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    # A typo leaves most of the word intact; only the differing middle needs the table
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    a, b = a[prefix:], b[prefix:]
+    suffix = 0
+    while suffix < len(a) and suffix < len(b) and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    if suffix:
+        a, b = a[:-suffix], b[:-suffix]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cb = b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < value:
+                value = before[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def allowed_distance(text, max_distance=MAX_DISTANCE):
+    """Edits tolerated for a query of this length"""
+    return min(max_distance, len(text) // CHARS_PER_EDIT)
+
+
+class FuzzyMatcher:
+    def __init__(self, symptom_mappings):
+        """Index {language: {phrase: symptom}}"""
+        self.indexes = {}
+        self.max_words = {}
+        for language, mapping in symptom_mappings.items():
+            phrases = [phrase for phrase in mapping if phrase]
+            postings = {}
+            for phrase_id, phrase in enumerate(phrases):
+                for gram in trigrams(phrase):
+                    postings.setdefault(gram, []).append(phrase_id)
+            self.indexes[language] = (postings, phrases, [mapping[p] for p in phrases])
+            # Longest run of words worth trying as one phrase
+            self.max_words[language] = max((len(p.split()) for p in phrases), default=0)
+
+    def lookup(self, text, language, max_distance=MAX_DISTANCE, limit=3):
+        """Up to limit (symptom, distance) pairs within max_distance edits of text, closest first"""
+        index = self.indexes.get(language)
+        if index is None or not text:
+            return []
+        postings, phrases, symptoms = index
+
+        grams = trigrams(text)
+        shared = Counter(chain.from_iterable(postings.get(gram, ()) for gram in grams))
+
+        needed = len(grams) - 4 * max_distance
+        best = {}
+        for phrase_id, count in shared.items():
+            if count < needed:
+                continue
+            distance = edit_distance(text, phrases[phrase_id], max_distance)
+            if distance <= max_distance:
+                symptom = symptoms[phrase_id]
+                if distance < best.get(symptom, max_distance + 1):
+                    best[symptom] = distance
+        return sorted(best.items(), key=lambda item: item[1])[:limit]
+
+    def find_symptoms(self, words, language, max_distance=MAX_DISTANCE):
+        """Symptoms for runs of words that are near a phrase, longest runs first.
+
+        Each word is used by at most one match. Returns (first_word, symptom)
+        pairs in order of appearance.
+        """
+        found = []
+        used = [False] * len(words)
+        for size in range(min(self.max_words.get(language, 0), len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                text = ' '.join(words[start:start + size])
+                distance = allowed_distance(text, max_distance)
+                if not distance:
+                    continue
+                candidates = self.lookup(text, language, distance, limit=1)
+                if candidates:
+                    found.append((start, candidates[0][0]))
+                    used[start:start + size] = [True] * size
+        return sorted(found)
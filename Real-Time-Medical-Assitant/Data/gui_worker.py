@@ -0,0 +1,89 @@
+"""Background worker that keeps the Tk GUIs responsive.
+
+Model loading, language switches, symptom extraction and prediction run
+one at a time on a single worker thread, in submission order. Results come
+back to Tk through a queue that the main loop polls with after() about 60
+times a second, so callbacks always run on the Tk thread.
+
+Jobs can be put in a group. cancel(group) drops every job of that group
+that has not run yet, and any result not yet delivered. Submitting with
+supersede=True first cancels the earlier jobs of the same group, so only
+the newest request in the group is answered.
+"""
+import queue
+import threading
+
+POLL_MS = 16
+
+
+class InferenceWorker:
+    def __init__(self, root, on_busy=None):
+        """Start the worker thread; on_busy(bool) is called on the Tk thread when busy state changes"""
+        self.root = root
+        self.on_busy = on_busy
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.epochs = {}
+        self.pending = 0
+        self.busy = False
+
+        self.thread = threading.Thread(target=self.run, name='chatbot-worker', daemon=True)
+        self.thread.start()
+        self.root.after(POLL_MS, self.poll)
+
+    def submit(self, func, *args, on_done=None, on_error=None, group=None, supersede=False):
+        """Queue func(*args) on the worker; on_done(result) or on_error(exception) run on the Tk thread"""
+        if supersede and group is not None:
+            self.cancel(group)
+        epoch = self.epochs.setdefault(group, 0)
+        self.pending += 1
+        self.update_busy()
+        self.jobs.put((group, epoch, func, args, on_done, on_error))
+
+    def cancel(self, group):
+        """Drop the group's queued jobs and any of its results not yet delivered"""
+        self.epochs[group] = self.epochs.get(group, 0) + 1
+
+    def is_current(self, group, epoch):
+        return group is None or self.epochs.get(group) == epoch
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            group, epoch, func, args, on_done, on_error = job
+            if not self.is_current(group, epoch):
+                # Stale: skip the work, but still report back so the busy count drops
+                self.results.put((group, epoch, None, None))
+                continue
+            try:
+                self.results.put((group, epoch, on_done, func(*args)))
+            except Exception as e:
+                if on_error is None:
+                    print(f"Background task failed: {str(e)}")
+                self.results.put((group, epoch, on_error, e))
+
+    def poll(self):
+        """Deliver finished results on the Tk thread, then reschedule"""
+        try:
+            while True:
+                group, epoch, callback, value = self.results.get_nowait()
+                self.pending -= 1
+                if callback is not None and self.is_current(group, epoch):
+                    callback(value)
+        except queue.Empty:
+            pass
+        self.update_busy()
+        self.root.after(POLL_MS, self.poll)
+
+    def update_busy(self):
+        busy = self.pending > 0
+        if busy != self.busy:
+            self.busy = busy
+            if self.on_busy is not None:
+                self.on_busy(busy)
+
+    def close(self):
+        """Stop the worker after the jobs already queued"""
+        self.jobs.put(None)
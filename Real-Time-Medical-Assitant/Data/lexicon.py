@@ -0,0 +1,188 @@
+"""Symptom and disease lexicons for the non-English chatbot languages.
+
+The lexicons live in Data/lexicon/<language>.json, one versioned file per
+language with phrase-to-symptom and English-to-local disease tables.
+Symptom phrases are stored in the tokenizer's canonical form, the same
+form typed input is reduced to. The first load compiles them into a
+binary pack under Data/cache: one interned string table plus (phrase
+id, symptom id) and (disease id, name id) integer pairs. Later processes
+read the pack instead of parsing JSON. Packs are named by a digest of
+the source files and tokenizer version, so editing a lexicon or the
+tokenizer rebuilds it.
+
+    python Data/lexicon.py            # compile the pack ahead of time
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from dataset import write_atomic
+from tokenizer import TOKENIZER_VERSION, normalize_phrases
+
+LEXICON_DIR = 'Data/lexicon'
+CACHE_DIR = 'Data/cache'
+LEXICON_VERSION = 1
+
+PACK_MAGIC = b'LEXP'
+PACK_FORMAT = 1
+SYMPTOMS, DISEASES = 0, 1
+_HEADER = struct.Struct('<4sIII')
+_SECTION = struct.Struct('<III')
+
+
+def read_sources(lexicon_dir=LEXICON_DIR):
+    """Raw bytes of every lexicon file, keyed by language"""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(lexicon_dir, '*.json'))):
+        language = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'rb') as f:
+            sources[language] = f.read()
+    return sources
+
+
+def sources_digest(sources):
+    hasher = hashlib.sha256(f'{PACK_FORMAT}:{LEXICON_VERSION}:{TOKENIZER_VERSION}'.encode())
+    for language, data in sources.items():
+        hasher.update(language.encode() + b'\0' + data)
+    return hasher.hexdigest()[:16]
+
+
+class Lexicon:
+    """Phrase-to-symptom and disease-name tables for every language"""
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, symptoms, diseases):
+        # {language: {phrase: symptom}} and {language: {english name: local name}}
+        self.symptoms = symptoms
+        self.diseases = diseases
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide lexicon, loading it on first use"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls.load()
+        return cls._shared
+
+    @classmethod
+    def load(cls, lexicon_dir=LEXICON_DIR, cache_dir=CACHE_DIR, force=False):
+        """Read the compiled pack for the current sources, compiling it if missing"""
+        sources = read_sources(lexicon_dir)
+        path = os.path.join(cache_dir, f'lexicon-{sources_digest(sources)}.pack')
+        if not force:
+            try:
+                with open(path, 'rb') as f:
+                    return cls.from_pack(f.read())
+            except (OSError, ValueError, struct.error):
+                pass
+
+        lexicon = cls.from_sources(sources)
+        try:
+            lexicon.save(path)
+        except OSError as e:
+            print(f"Could not write lexicon pack: {str(e)}")
+        return lexicon
+
+    def save(self, path):
+        """Atomically write the pack so concurrent readers never see a partial file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        pack = self.to_pack()
+
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(pack)
+        write_atomic(path, write)
+
+    @classmethod
+    def from_sources(cls, sources):
+        symptoms, diseases = {}, {}
+        for language, data in sources.items():
+            document = json.loads(data)
+            if document.get('version') != LEXICON_VERSION:
+                raise ValueError(f"Unsupported lexicon version in {language}: {document.get('version')}")
+            symptoms[language] = normalize_phrases(document['symptoms'], language)
+            diseases[language] = document['diseases']
+        return cls(symptoms, diseases)
+
+    def to_pack(self):
+        """Serialize as a string table followed by integer id pairs per section"""
+        string_ids = {}
+
+        def intern(s):
+            return string_ids.setdefault(s, len(string_ids))
+
+        sections = []
+        for kind, tables in ((SYMPTOMS, self.symptoms), (DISEASES, self.diseases)):
+            for language, table in tables.items():
+                pairs = array('I')
+                for key, value in table.items():
+                    pairs.append(intern(key))
+                    pairs.append(intern(value))
+                sections.append((intern(language), kind, pairs))
+
+        blob = '\0'.join(string_ids).encode('utf-8')
+        parts = [_HEADER.pack(PACK_MAGIC, PACK_FORMAT, len(blob), len(sections)), blob]
+        for language_id, kind, pairs in sections:
+            if sys.byteorder != 'little':
+                pairs.byteswap()
+            parts.append(_SECTION.pack(language_id, kind, len(pairs) // 2))
+            parts.append(pairs.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_pack(cls, data):
+        magic, version, blob_size, n_sections = _HEADER.unpack_from(data)
+        if magic != PACK_MAGIC or version != PACK_FORMAT:
+            raise ValueError('Not a lexicon pack')
+        offset = _HEADER.size
+        # Each distinct string is decoded once, so repeated symptom names share one object
+        strings = data[offset:offset + blob_size].decode('utf-8').split('\0')
+        offset += blob_size
+
+        symptoms, diseases = {}, {}
+        for _ in range(n_sections):
+            language_id, kind, n_pairs = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            pairs = array('I')
+            pairs.frombytes(data[offset:offset + 8 * n_pairs])
+            offset += 8 * n_pairs
+            if sys.byteorder != 'little':
+                pairs.byteswap()
+            ids = pairs.tolist()
+            table = dict(zip(map(strings.__getitem__, ids[0::2]),
+                             map(strings.__getitem__, ids[1::2])))
+            (symptoms if kind == SYMPTOMS else diseases)[strings[language_id]] = table
+        return cls(symptoms, diseases)
+
+    def symptom_phrases(self, language):
+        """Localized phrase-to-symptom table, empty for English"""
+        return self.symptoms.get(language, {})
+
+    def disease_names(self, language):
+        """English-to-localized disease name table, empty for English"""
+        return self.diseases.get(language, {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the lexicon files into a binary pack')
+    parser.add_argument('--lexicon-dir', default=LEXICON_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', action='store_true', help='rebuild even if a pack exists')
+    args = parser.parse_args()
+
+    lexicon = Lexicon.load(args.lexicon_dir, args.cache_dir, force=args.force)
+    for language in lexicon.symptoms:
+        print(f"{language}: {len(lexicon.symptoms[language])} symptom phrases, "
+              f"{len(lexicon.diseases.get(language, {}))} disease names")
+
+
+if __name__ == "__main__":
+    main()
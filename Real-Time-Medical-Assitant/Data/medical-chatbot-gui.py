@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from model import MedicalChatbot
+from gui_worker import InferenceWorker
 
 class ChatbotGUI:
     def __init__(self, root):
@@ -64,13 +65,30 @@ class ChatbotGUI:
         # Buttons Frame
         self.create_button_frame()
         
-        # Initialize chatbot
-        self.chatbot = MedicalChatbot(language='en')
+        # Busy indicator
+        self.create_status_frame()
+        
+        # Initialize chatbot in the background; it is only used on the worker thread
+        self.chatbot = None
         self.current_symptoms = []
+        self.worker = InferenceWorker(self.root, on_busy=self.set_busy)
+        self.worker.submit(self.load_chatbot, on_error=self.show_load_error)
         
         # Initial welcome message
         self.display_welcome_message()
 
+    def load_chatbot(self):
+        """Build the chatbot (worker thread)"""
+        self.chatbot = MedicalChatbot(language='en')
+
+    def show_load_error(self, error):
+        messagebox.showerror("Loading Error", f"Could not load the model: {str(error)}")
+
+    def cancel_pending(self):
+        """Drop queued extractions and predictions whose answers are no longer wanted"""
+        self.worker.cancel('input')
+        self.worker.cancel('prediction')
+
     def create_language_frame(self):
         """Create language selection frame with improved design"""
         self.lang_frame = ttk.Frame(self.root)
@@ -109,21 +127,24 @@ class ChatbotGUI:
         self.display_user_message(user_input)
         self.input_entry.delete(0, tk.END)
         
-        # Enhanced input processing
-        try:
-            # Extract symptoms
-            new_symptoms = self.chatbot.extract_symptoms_from_text(user_input)
-            
-            if new_symptoms:
-                self.current_symptoms.extend(new_symptoms)
-                self.make_prediction()
-            else:
-                # More informative message about symptom extraction
-                messagebox.showinfo("Symptom Detection", 
-                    "Could not detect specific symptoms. Please describe symptoms more clearly.")
-        
-        except Exception as e:
-            messagebox.showerror("Processing Error", f"An error occurred: {str(e)}")
+        # Extract symptoms on the worker
+        self.worker.submit(
+            lambda: self.chatbot.extract_symptoms_from_text(user_input),
+            on_done=self.add_symptoms,
+            on_error=lambda e: messagebox.showerror("Processing Error", f"An error occurred: {str(e)}"),
+            group='input'
+        )
+
+    def add_symptoms(self, new_symptoms):
+        """Take the symptoms extracted from one message"""
+        if new_symptoms:
+            # Symptoms repeated across messages are only counted once
+            self.current_symptoms.extend(s for s in new_symptoms if s not in self.current_symptoms)
+            self.make_prediction()
+        else:
+            # More informative message about symptom extraction
+            messagebox.showinfo("Symptom Detection", 
+                "Could not detect specific symptoms. Please describe symptoms more clearly.")
 
     def make_prediction(self):
         """Enhanced prediction with more detailed output"""
@@ -131,30 +152,35 @@ class ChatbotGUI:
             messagebox.showwarning("No Symptoms", "Please enter some symptoms.")
             return
         
-        try:
-            # Get predictions
-            predictions = self.chatbot.predict_condition(self.current_symptoms)
+        # A newer message supersedes a prediction that has not been shown yet
+        self.worker.submit(
+            self.build_report,
+            list(self.current_symptoms),
+            on_done=self.display_bot_message,
+            on_error=lambda e: messagebox.showerror("Prediction Error", f"Could not complete prediction: {str(e)}"),
+            group='prediction',
+            supersede=True
+        )
+
+    def build_report(self, symptoms):
+        """Predict and format the result message (worker thread)"""
+        predictions = self.chatbot.predict_condition(symptoms)
+        
+        # Detailed result display
+        result = "Possible Conditions:\n\n"
+        for condition, confidence in predictions:
+            result += f"• {condition} (Confidence: {confidence:.2f}%)\n"
             
-            # Detailed result display
-            result = "Possible Conditions:\n\n"
-            for condition, confidence in predictions:
-                result += f"• {condition} (Confidence: {confidence:.2f}%)\n"
-                
-                # Add description and precautions
-                description = self.chatbot.get_description(condition)
-                precautions = self.chatbot.get_precautions(condition)
-                
-                result += f"  Description: {description}\n"
-                result += "  Precautions:\n"
-                for i, precaution in enumerate(precautions, 1):
-                    result += f"  {i}. {precaution}\n"
-                result += "\n"
+            # Add description and precautions
+            description = self.chatbot.get_description(condition)
+            precautions = self.chatbot.get_precautions(condition)
             
-            # Display in chat
-            self.display_bot_message(result)
-        
-        except Exception as e:
-            messagebox.showerror("Prediction Error", f"Could not complete prediction: {str(e)}")
+            result += f"  Description: {description}\n"
+            result += "  Precautions:\n"
+            for i, precaution in enumerate(precautions, 1):
+                result += f"  {i}. {precaution}\n"
+            result += "\n"
+        return result
 
     def change_language(self):
         """Change the interface language"""
@@ -167,25 +193,30 @@ class ChatbotGUI:
             self.lang_var.set('en')  # Reset to English if invalid
             lang = 'en'
         
-        try:
-            # Update chatbot language
-            self.chatbot = MedicalChatbot(language=lang)
-            
-            # Update UI text
-            self.root.title(self.ui_text[lang]['title'])
-            self.input_label.config(text=self.ui_text[lang]['enter_symptoms'])
-            self.send_button.config(text=self.ui_text[lang]['send'])
-            self.clear_button.config(text=self.ui_text[lang]['clear'])
-            self.start_over_button.config(text=self.ui_text[lang]['start_over'])
-            
-            # Clear chat and show welcome message in new language
-            self.chat_display.delete(1.0, tk.END)
-            self.current_symptoms = []
-            self.display_bot_message(self.ui_text[lang]['welcome'])
-        except Exception as e:
-            print(f"Error changing language: {str(e)}")
-            messagebox.showerror("Error", "Failed to change language. Reverting to English.")
+        # Switch the existing chatbot on the worker; the trained model is shared across languages.
+        # Answers still pending in the old language are stale, the switch itself always runs
+        self.cancel_pending()
+        self.worker.submit(lambda: self.chatbot.change_language(lang),
+                           on_error=self.language_failed)
+        
+        # Update UI text
+        self.root.title(self.ui_text[lang]['title'])
+        self.input_label.config(text=self.ui_text[lang]['enter_symptoms'])
+        self.send_button.config(text=self.ui_text[lang]['send'])
+        self.clear_button.config(text=self.ui_text[lang]['clear'])
+        self.start_over_button.config(text=self.ui_text[lang]['start_over'])
+        
+        # Clear chat and show welcome message in new language
+        self.chat_display.delete(1.0, tk.END)
+        self.current_symptoms = []
+        self.display_bot_message(self.ui_text[lang]['welcome'])
+
+    def language_failed(self, error):
+        print(f"Error changing language: {str(error)}")
+        messagebox.showerror("Error", "Failed to change language. Reverting to English.")
+        if self.lang_var.get() != 'en':
             self.lang_var.set('en')
+            self.change_language()
 
     def create_chat_display(self):
         """Create chat display area with scrolling"""
@@ -260,6 +291,27 @@ class ChatbotGUI:
         )
         self.start_over_button.pack(side=tk.LEFT, padx=5)
 
+    def create_status_frame(self):
+        """Create the busy indicator shown while the worker has requests in flight"""
+        self.status_frame = ttk.Frame(self.root)
+        self.status_frame.pack(pady=(0, 10), padx=10, fill='x')
+        
+        self.status_label = ttk.Label(self.status_frame, text='')
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        
+        self.progress = ttk.Progressbar(self.status_frame, mode='indeterminate', length=150)
+
+    def set_busy(self, busy):
+        """Show or hide the busy indicator"""
+        if busy:
+            self.status_label.config(text="Working...")
+            self.progress.pack(side=tk.RIGHT, padx=5)
+            self.progress.start(15)
+        else:
+            self.status_label.config(text='')
+            self.progress.stop()
+            self.progress.pack_forget()
+
     def display_welcome_message(self):
         """Display initial welcome message"""
         welcome_text = "Welcome to the Medical Assistant!\nPlease describe your symptoms."
@@ -277,6 +329,7 @@ class ChatbotGUI:
 
     def clear_chat(self):
         """Clear chat display"""
+        self.cancel_pending()
         self.chat_display.delete(1.0, tk.END)
         self.current_symptoms = []
         self.display_welcome_message()
@@ -284,12 +337,14 @@ class ChatbotGUI:
     def start_over(self):
         """Reset the chat and start over"""
         self.clear_chat()
-        self.chatbot = MedicalChatbot(language=self.lang_var.get())
+        lang = self.lang_var.get()
+        self.worker.submit(lambda: self.chatbot.change_language(lang), on_error=self.language_failed)
 
 def main():
     root = tk.Tk()
     app = ChatbotGUI(root)
     root.mainloop()
+    app.worker.close()
 
 if __name__ == "__main__":
     main()
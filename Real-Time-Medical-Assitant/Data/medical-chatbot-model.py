@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
+from training_data import fit_forest, prepare_training_set
 
 class MedicalChatbot:
     def __init__(self, language='en'):
@@ -22,30 +22,31 @@ class MedicalChatbot:
 
     def train_model_enhanced(self):
         """Enhanced model training with cross-validation and feature importance"""
-        # Prepare training data
-        X = self.df_training.drop('prognosis', axis=1)
-        y = self.df_training['prognosis']
-        
         # Split data for validation
-        X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, random_state=42)
+        df_train, df_val = train_test_split(self.df_training, test_size=0.2, random_state=42)
+        
+        # Collapse repeated rows into weighted unique rows
+        train_set = prepare_training_set(df_train)
+        val_set = prepare_training_set(df_val)
+        X_val, y_val = val_set.frame(), val_set.classes[val_set.y]
         
         # Multiple models for ensemble
-        models = [
-            RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42),
-            RandomForestClassifier(n_estimators=150, max_depth=15, random_state=42)
+        model_params = [
+            {'n_estimators': 100, 'max_depth': 10, 'random_state': 42},
+            {'n_estimators': 150, 'max_depth': 15, 'random_state': 42}
         ]
         
-        # Train and evaluate models
+        # Train and evaluate models; fit_forest bootstraps the weighted rows like raw rows
         self.trained_models = []
-        for model in models:
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_val)
-            print(f"Model Accuracy: {accuracy_score(y_val, y_pred)}")
+        for params in model_params:
+            model = fit_forest(train_set, params)
+            y_pred = train_set.classes[model.predict(X_val)]
+            print(f"Model Accuracy: {accuracy_score(y_val, y_pred, sample_weight=val_set.sample_weight)}")
             self.trained_models.append(model)
         
         # Identify most important features
         feature_importances = np.mean([model.feature_importances_ for model in self.trained_models], axis=0)
-        self.important_symptoms = list(zip(X.columns, feature_importances))
+        self.important_symptoms = list(zip(train_set.symptoms, feature_importances))
         self.important_symptoms.sort(key=lambda x: x[1], reverse=True)
 
     def predict_condition(self, symptoms):
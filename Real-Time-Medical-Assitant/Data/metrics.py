@@ -0,0 +1,154 @@
+"""Opt-in per-stage timing for the chatbot pipeline.
+
+Stages are recorded as latency histograms labelled by stage and language,
+alongside simple event counters such as profile index hits. Both can be
+exported as Prometheus text or as a JSON-friendly dict.
+Recording is off by default. Turn it on with CHATBOT_METRICS=1 in the
+environment or with metrics.enable(). Methods marked with @timed are only
+wrapped while recording is enabled, so there is no overhead when it is off.
+
+    import metrics
+    metrics.enable()
+    ...
+    print(metrics.registry.prometheus_text())
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Histogram upper bounds in seconds
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+           0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, stage, language, seconds):
+        """Record one call of a stage"""
+        key = (stage, language or '')
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': [0] * (len(BUCKETS) + 1),
+                    'count': 0,
+                    'sum': 0.0
+                }
+            histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+
+    def count(self, name, result):
+        """Increment the counter for one outcome of an event, e.g. ('profile_index', 'exact')"""
+        key = (name, result)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """Counts, totals and cumulative buckets per stage and language"""
+        with self._lock:
+            items = [(key, dict(h, buckets=list(h['buckets']))) for key, h in self._histograms.items()]
+            counters = sorted(self._counters.items())
+        stages = {}
+        for (stage, language), histogram in sorted(items):
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(BUCKETS + (float('inf'),), histogram['buckets']):
+                cumulative += count
+                buckets['+Inf' if bound == float('inf') else repr(bound)] = cumulative
+            stages.setdefault(stage, {})[language] = {
+                'count': histogram['count'],
+                'sum_seconds': histogram['sum'],
+                'mean_seconds': histogram['sum'] / histogram['count'],
+                'buckets': buckets
+            }
+        counts = {}
+        for (name, result), value in counters:
+            counts.setdefault(name, {})[result] = value
+        return {'enabled': self.enabled, 'stages': stages, 'counters': counts}
+
+    def prometheus_text(self):
+        """Render the histograms in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP chatbot_stage_seconds Latency of chatbot pipeline stages.',
+            '# TYPE chatbot_stage_seconds histogram'
+        ]
+        for stage, languages in snapshot['stages'].items():
+            for language, histogram in languages.items():
+                labels = f'stage="{stage}",language="{language}"'
+                for bound, count in histogram['buckets'].items():
+                    lines.append(f'chatbot_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'chatbot_stage_seconds_sum{{{labels}}} {histogram["sum_seconds"]:.9f}')
+                lines.append(f'chatbot_stage_seconds_count{{{labels}}} {histogram["count"]}')
+        for name, results in snapshot['counters'].items():
+            lines.append(f'# TYPE chatbot_{name}_total counter')
+            for result, value in results.items():
+                lines.append(f'chatbot_{name}_total{{result="{result}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry(enabled=os.environ.get('CHATBOT_METRICS', '') not in ('', '0'))
+
+# (class, attribute name, original function, stage) for every @timed method
+_instrumented = []
+
+
+def _wrap(func, stage):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # Read the label up front: load_language_data may fall back to English
+        language = getattr(self, 'language', '')
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            registry.observe(stage, language, time.perf_counter() - start)
+    return wrapper
+
+
+def timed(stage):
+    """Mark a method to be timed under stage; takes effect on @instrument classes"""
+    def decorator(func):
+        func.metrics_stage = stage
+        return func
+    return decorator
+
+
+def instrument(cls):
+    """Class decorator registering the class's @timed methods for enable()"""
+    for name, attr in list(vars(cls).items()):
+        stage = getattr(attr, 'metrics_stage', None)
+        if stage is not None:
+            _instrumented.append((cls, name, attr, stage))
+            if registry.enabled:
+                setattr(cls, name, _wrap(attr, stage))
+    return cls
+
+
+def enable():
+    """Start recording by swapping timing wrappers in for every @timed method"""
+    registry.enabled = True
+    for cls, name, func, stage in _instrumented:
+        setattr(cls, name, _wrap(func, stage))
+
+
+def disable():
+    """Stop recording and restore the original, unwrapped methods"""
+    registry.enabled = False
+    for cls, name, func, stage in _instrumented:
+        setattr(cls, name, func)
@@ -1,437 +1,385 @@
-import pandas as pd
+import threading
+
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+from model_store import ModelStore, MODEL_PARAMS, TRAINING_FILE
+from forest_engine import top_k, top_k_rows
+from backends import BACKENDS, build_backend
+from training_data import prepare_training_set
+from profile_index import ProfileIndex
+from question_recommender import QuestionRecommender
+from triage import SeverityTriage, load_severity_weights
+from symptom_matcher import SymptomMatcher
+from fuzzy_matcher import FuzzyMatcher, MAX_DISTANCE, allowed_distance
+from tokenizer import normalize_phrase, tokenize
+from resource_cache import LRUCache
+from lexicon import Lexicon
+from dataset import load_dataset, read_table
+from metrics import instrument, timed
 
-class MedicalChatbot:
-    def __init__(self, language='en'):
-        self.language = language
-        self.label_encoder = LabelEncoder()
-        
-        # Define language-specific data file paths
-        self.language_files = {
-            'en': {
-                'description': 'Data/symptom_Description.csv',
-                'precaution': 'Data/symptom_precaution.csv',
-                'severity': 'Data/Symptom_severity.csv'
-            },
-            'hi': {
-                'description': 'Data/symptom_Description_Hindi.csv',
-                'precaution': 'Data/symptom_precaution_Hindi.csv',
-                'severity': 'Data/Symptom_severity_Hindi.csv'
-            },
-            'te': {
-                'description': 'Data/symptom_Description_Telugu.csv',
-                'precaution': 'Data/symptom_precaution_Telugu.csv',
-                'severity': 'Data/Symptom_severity_Telugu.csv'
-            }
-        }
-        
-        # Disease translations
-        self.disease_mappings = {
-            'hi': {
-                'Fungal infection': 'फंगल संक्रमण',
-                'Allergy': 'एलर्जी',
-                'GERD': 'गैस्ट्रोइसोफेगल रिफ्लक्स रोग',
-                'Chronic cholestasis': 'क्रोनिक कोलेस्टासिस',
-                'Drug Reaction': 'दवा प्रतिक्रिया',
-                'Peptic ulcer disease': 'पेप्टिक अल्सर रोग',
-                'AIDS': 'एड्स',
-                'Diabetes': 'मधुमेह',
-                'Gastroenteritis': 'गैस्ट्रोएंटेराइटिस',
-                'Bronchial Asthma': 'ब्रोंकियल अस्थमा',
-                'Hypertension': 'उच्च रक्तचाप',
-                'Migraine': 'माइग्रेन',
-                'Cervical spondylosis': 'सर्वाइकल स्पॉन्डिलाइटिस',
-                'Paralysis (brain hemorrhage)': 'लकवा (मस्तिष्क रक्तस्राव)',
-                'Jaundice': 'पीलिया',
-                'Malaria': 'मलेरिया',
-                'Chicken pox': 'चेचक',
-                'Dengue': 'डेंगू',
-                'Typhoid': 'टाइफाइड',
-                'Hepatitis A': 'हेपेटाइटिस ए',
-                'Hepatitis B': 'हेपेटाइटिस बी',
-                'Hepatitis C': 'हेपेटाइटिस सी',
-                'Hepatitis D': 'हेपेटाइटिस डी',
-                'Hepatitis E': 'हेपेटाइटिस ई',
-                'Alcoholic hepatitis': 'अल्कोहलिक हेपेटाइटिस',
-                'Tuberculosis': 'क्षय रोग',
-                'Common Cold': 'सामान्य सर्दी',
-                'Pneumonia': 'निमोनिया',
-                'Dimorphic hemorrhoids(piles)': 'बवासीर',
-                'Heart attack': 'दिल का दौरा',
-                'Varicose veins': 'वैरिकोस नसें',
-                'Hypothyroidism': 'हाइपोथायरायडिज्म',
-                'Hyperthyroidism': 'हाइपरथायरायडिज्म',
-                'Hypoglycemia': 'हाइपोग्लाइसीमिया',
-                'Osteoarthritis': 'ऑस्टियोआर्थराइटिस',
-                'Arthritis': 'गठिया',
-                'Vertigo': 'वर्टिगो',
-                'Acne': 'मुंहासे',
-                'Urinary tract infection': 'मूत्र मार्ग संक्रमण',
-                'Psoriasis': 'सोरायसिस',
-                'Impetigo': 'इम्पेटिगो'
-            },
-            'te': {
-                'Fungal infection': 'శిలీంధ్ర సంక్రమణ',
-                'Allergy': 'అలెర్జీ',
-                'GERD': 'గ్యాస్ట్రోఎసోఫేగల్ రిఫ్లక్స్ వ్యాధి',
-                'Chronic cholestasis': 'దీర్ఘకాలిక కోలెస్టాసిస్',
-                'Drug Reaction': 'మందుల ప్రతిచర్య',
-                'Peptic ulcer disease': 'పెప్టిక్ అల్సర్ వ్యాధి',
-                'AIDS': 'ఎయిడ్స్',
-                'Diabetes': 'మధుమేహం',
-                'Gastroenteritis': 'గ్యాస్ట్రోఎంటరైటిస్',
-                'Bronchial Asthma': 'ఊపిరితిత్తుల ఆస్తమా',
-                'Hypertension': 'అధిక రక్తపోటు',
-                'Migraine': 'అర్ధశిరోవేదన',
-                'Cervical spondylosis': 'మెడ స్పాండిలైటిస్',
-                'Paralysis (brain hemorrhage)': 'పక్షవాతం (మెదడు రక్తస్రావం)',
-                'Jaundice': 'కామెర్ల',
-                'Malaria': 'మలేరియా',
-                'Chicken pox': 'చికెన్ పాక్స్',
-                'Dengue': 'డెంగ్యూ',
-                'Typhoid': 'టైఫాయిడ్',
-                'Hepatitis A': 'హెపటైటిస్ ఎ',
-                'Hepatitis B': 'హెపటైటిస్ బి',
-                'Hepatitis C': 'హెపటైటిస్ సి',
-                'Hepatitis D': 'హెపటైటిస్ డి',
-                'Hepatitis E': 'హెపటైటిస్ ఇ',
-                'Alcoholic hepatitis': 'మద్యపాన హెపటైటిస్',
-                'Tuberculosis': 'క్షయ',
-                'Common Cold': 'జలుబు',
-                'Pneumonia': 'న్యుమోనియా',
-                'Dimorphic hemorrhoids(piles)': 'మూలవ్యాధి',
-                'Heart attack': 'గుండెపోటు',
-                'Varicose veins': 'వారికోస్ సిరలు',
-                'Hypothyroidism': 'హైపోథైరాయిడిజం',
-                'Hyperthyroidism': 'హైపర్థైరాయిడిజం',
-                'Hypoglycemia': 'హైపోగ్లైసీమియా',
-                'Osteoarthritis': 'ఆస్టియోఆర్థ్రైటిస్',
-                'Arthritis': 'కీళ్ల వాతం',
-                'Vertigo': 'వెర్టిగో',
-                'Acne': 'మొటిమలు',
-                'Urinary tract infection': 'మూత్ర మార్గ సంక్రమణ',
-                'Psoriasis': 'సోరియాసిస్',
-                'Impetigo': 'ఇంపెటిగో'
-            }
-        }
+# Training labels that are spelled differently from the description and precaution tables
+DISEASE_NAME_FIXES = {
+    'Dimorphic hemmorhoids(piles)': 'Dimorphic hemorrhoids(piles)',
+    'Hypertension ': 'Hypertension',
+    'Diabetes ': 'Diabetes'
+}
+
+# Per-language tables and mappings, shared by every chatbot in the process and
+# keyed by (language, model key) since mappings depend on the model's columns
+LANGUAGE_CACHE_SIZE = 3
+language_cache = LRUCache(maxsize=LANGUAGE_CACHE_SIZE)
+
+# Top-k predictions keyed by (model key, backend, language, k, symptom bitmask). Common
+# complaints repeat a lot, and the GUIs re-predict the same set on every turn.
+PREDICTION_CACHE_SIZE = 4096
+prediction_cache = LRUCache(maxsize=PREDICTION_CACHE_SIZE)
+
+# Language-specific data file paths
+LANGUAGE_FILES = {
+    'en': {
+        'description': 'Data/symptom_Description.csv',
+        'precaution': 'Data/symptom_precaution.csv',
+        'severity': 'Data/Symptom_severity.csv'
+    },
+    'hi': {
+        'description': 'Data/symptom_Description_Hindi.csv',
+        'precaution': 'Data/symptom_precaution_Hindi.csv',
+        'severity': 'Data/Symptom_severity_Hindi.csv'
+    },
+    'te': {
+        'description': 'Data/symptom_Description_Telugu.csv',
+        'precaution': 'Data/symptom_precaution_Telugu.csv',
+        'severity': 'Data/Symptom_severity_Telugu.csv'
+    }
+}
+
+def normalize_disease_name(name):
+    """Lookup key for a disease name: known spelling fixes, collapsed whitespace, lowercase"""
+    name = ' '.join(str(name).split())
+    return DISEASE_NAME_FIXES.get(name, name).lower()
+
+@instrument
+class ChatbotCore:
+    """Language-independent chatbot state shared by any number of language views"""
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, model_store=None):
+        self.model_store = model_store or ModelStore()
         
-        # Load training data
-        self.df_training = pd.read_csv('Data/Training.csv')
+        # Memory-mapped uint8 training matrix; the DataFrame is only built on request
+        self.training_data = load_dataset(TRAINING_FILE)
+        self._df_training = None
         
         # Initialize symptoms from training data
-        self.symptoms = list(self.df_training.columns[:-1])  # All columns except 'prognosis'
+        self.symptoms = list(self.training_data.symptoms)  # All columns except 'prognosis'
+        self.symptom_index = {symptom: i for i, symptom in enumerate(self.symptoms)}
         
-        # Initialize language-specific symptom mappings
-        self.symptom_mappings = {
-            'en': {symptom.lower().replace('_', ' '): symptom for symptom in self.symptoms},
-            'hi': {
-                        'खुजली': 'itching',
-                        'त्वचा पर चकत्ते': 'skin_rash',
-                        'गांठदार त्वचा पर दाने': 'nodal_skin_eruptions',
-                        'लगातार छींक आना': 'continuous_sneezing',
-                        'कंपकंपी': 'shivering',
-                        'ठंड लगना': 'chills',
-                        'जोड़ों में दर्द': 'joint_pain',
-                        'पेट में दर्द': 'stomach_pain',
-                        'एसिडिटी': 'acidity',
-                        'जीभ पर छाले': 'ulcers_on_tongue',
-                        'मांसपेशियों में कमजोरी': 'muscle_wasting',
-                        'उल्टी': 'vomiting',
-                        'पेशाब में जलन': 'burning_micturition',
-                        'दाग-धब्बे पेशाब': 'spotting_urination',
-                        'थकान': 'fatigue',
-                        'वजन बढ़ना': 'weight_gain',
-                        'चिंता': 'anxiety',
-                        'ठंडे हाथ और पैर': 'cold_hands_and_feets',
-                        'मूड में बदलाव': 'mood_swings',
-                        'वजन घटना': 'weight_loss',
-                        'बेचैनी': 'restlessness',
-                        'सुस्ती': 'lethargy',
-                        'गले में पैच': 'patches_in_throat',
-                        'अनियमित शुगर स्तर': 'irregular_sugar_level',
-                        'खांसी': 'cough',
-                        'तेज बुखार': 'high_fever',
-                        'धँसी हुई आँखें': 'sunken_eyes',
-                        'सांस फूलना': 'breathlessness',
-                        'पसीना': 'sweating',
-                        'निर्जलीकरण': 'dehydration',
-                        'अपच': 'indigestion',
-                        'सिरदर्द': 'headache',
-                        'त्वचा का पीला पड़ना': 'yellowish_skin',
-                        'गहरे रंग का मूत्र': 'dark_urine',
-                        'मतली': 'nausea',
-                        'भूख न लगना': 'loss_of_appetite',
-                        'आँखों के पीछे दर्द': 'pain_behind_the_eyes',
-                        'पीठ दर्द': 'back_pain',
-                        'कब्ज': 'constipation',
-                        'पेट दर्द': 'abdominal_pain',
-                        'दस्त': 'diarrhoea',
-                        'हल्का बुखार': 'mild_fever',
-                        'पेशाब पीला': 'yellow_urine',
-                        'आँखों का पीला होना': 'yellowing_of_eyes',
-                        'तीव्र यकृत विफलता': 'acute_liver_failure',
-                        'तरल पदार्थ की अधिकता': 'fluid_overload',
-                        'पेट का फूलना': 'swelling_of_stomach',
-                        'लिम्फ नोड्स में सूजन': 'swelled_lymph_nodes',
-                        'अस्वस्थता': 'malaise',
-                        'धुंधली और विकृत दृष्टि': 'blurred_and_distorted_vision',
-                        'कफ': 'phlegm',
-                        'गले में जलन': 'throat_irritation',
-                        'आंखों की लाली': 'redness_of_eyes',
-                        'साइनस का दबाव': 'sinus_pressure',
-                        'नाक बहना': 'runny_nose',
-                        'कब्ज': 'congestion',
-                        'सीने में दर्द': 'chest_pain',
-                        'अंगों में कमजोरी': 'weakness_in_limbs',
-                        'दिल की तेज़ गति': 'fast_heart_rate',
-                        'मल त्याग के दौरान दर्द': 'pain_during_bowel_movements',
-                        'गुदा क्षेत्र में दर्द': 'pain_in_anal_region',
-                        'मल में खून': 'bloody_stool',
-                        'गुदा में जलन': 'irritation_in_anus',
-                        'गर्दन में दर्द': 'neck_pain',
-                        'चक्कर आना': 'dizziness',
-                        'ऐंठन': 'cramps',
-                        'चोट': 'bruising',
-                        'मोटापा': 'obesity',
-                        'सूजे हुए पैर': 'swollen_legs',
-                        'सूजी हुई रक्त वाहिकाएं': 'swollen_blood_vessels',
-                        'फूला हुआ चेहरा और आंखें': 'puffy_face_and_eyes',
-                        'बढ़ा हुआ थायरॉइड': 'enlarged_thyroid',
-                        'भंगुर नाखून': 'brittle_nails',
-                        'सूजे हुए हाथ-पैर': 'swollen_extremeties',
-                        'अत्यधिक भूख': 'excessive_hunger',
-                        'विवाहेतर संपर्क': 'extra_marital_contacts',
-                        'होठों का सूखना और झुनझुनी': 'drying_and_tingling_lips',
-                        'अस्पष्ट बोलना': 'slurred_speech',
-                        'घुटनों का दर्द': 'knee_pain',
-                        'कूल्हे के जोड़ों का दर्द': 'hip_joint_pain',
-                        'मांसपेशियों में कमजोरी': 'muscle_weakness',
-                        'गर्दन में अकड़न': 'stiff_neck',
-                        'जोड़ों में सूजन': 'swelling_joints',
-                        'गति में कठोरता': 'movement_stiffness',
-                        'घूमना': 'spinning_movements',
-                        'संतुलन खोना': 'loss_of_balance',
-                        'अस्थिरता': 'unsteadiness',
-                        'शरीर के एक तरफ की कमजोरी': 'weakness_of_one_body_side',
-                        'गंध की हानि': 'loss_of_smell',
-                        'मूत्राशय में असुविधा': 'bladder_discomfort',
-                        'मूत्र की दुर्गंध': 'foul_smell_of_urine',
-                        'लगातार पेशाब का अहसास': 'continuous_feel_of_urine',
-                        'गैसों का निकलना': 'passage_of_gases',
-                        'आंतरिक खुजली': 'internal_itching',
-                        'विषै��ा रूप (टाइफोस)': 'toxic_look_(typhos)',
-                        'अवसाद': 'depression',
-                        'चिड़चिड़ापन': 'irritability',
-                        'मांसपेशियों में दर्द': 'muscle_pain',
-                        'संवेदी संवेदना में बदलाव': 'altered_sensorium',
-                        'शरीर पर लाल धब्बे': 'red_spots_over_body',
-                        'पेट में दर्द': 'belly_pain',
-                        'असामान्य मासिक धर्म': 'abnormal_menstruation',
-                        'त्वचा पर धब्बे': 'dischromic_patches',
-                        'आँखों से पानी आना': 'watering_from_eyes',
-                        'भूख बढ़ना': 'increased_appetite',
-                        'बहुमूत्रता': 'polyuria',
-                        'पारिवारिक इतिहास': 'family_history',
-                        'श्लेष्मा बलगम': 'mucoid_sputum',
-                        'जंग लगा बलगम': 'rusty_sputum',
-                        'एकाग्रता की कमी': 'lack_of_concentration',
-                        'दृष्टि विकार': 'visual_disturbances',
-                        'रक्त चढ़ाना': 'receiving_blood_transfusion',
-                        'अस्वच्छ इंजेक्शन': 'receiving_unsterile_injections',
-                        'कोमा': 'coma',
-                        'पेट से रक्तस्राव': 'stomach_bleeding',
-                        'पेट का फूलना': 'distention_of_abdomen',
-                        'शराब पीने का इतिहास': 'history_of_alcohol_consumption',
-                        'तरल पदार्थ अधिकता': 'fluid_overload',
-                        'बलगम में खून': 'blood_in_sputum',
-                        'पिंडली की उभरी नसें': 'prominent_veins_on_calf',
-                        'धड़कन': 'palpitations',
-                        'चलने में दर्द': 'painful_walking',
-                        'मवाद भरे फुंसी': 'pus_filled_pimples',
-                        'ब्लैकहेड्स': 'blackheads',
-                        'त्वचा खरोंच': 'scurring',
-                        'त्वचा का छिलना': 'skin_peeling',
-                        'चांदी जैसी धूल': 'silver_like_dusting',
-                        'नाखूनों में छोटे गड्ढे': 'small_dents_in_nails',
-                        'सूजे हुए नाखून': 'inflammatory_nails',
-                        'छाला': 'blister',
-                        'नाक के आसपास लाल घाव': 'red_sore_around_nose',
-                        'पीली पपड़ी': 'yellow_crust_ooze'
-                    }, # Add Hindi mappings here
-            'te': {
-                    'దురద': 'itching',
-                    'చర్మం_దద్దుర్లు': 'skin_rash',
-                    'నోడల్_చర్మం_విస్ఫోటనాలు': 'nodal_skin_eruptions',
-                    'నిరంతర_తుమ్ములు': 'continuous_sneezing',
-                    'వణుకు': 'shivering',
-                    'చలి': 'chills',
-                    'కీళ్ల_నొప్పి': 'joint_pain',
-                    'కడుపు_నొప్పి': 'stomach_pain',
-                    'ఆమ్లత్వం': 'acidity',
-                    'నాలుకపై_పూత': 'ulcers_on_tongue',
-                    'కండరాలు_వ్యర్థం': 'muscle_wasting',
-                    'వాంతులు': 'vomiting',
-                    'మంట_మూత్రవిసర్జన': 'burning_micturition',
-                    'మచ్చలు మూత్రవిసర్జన': 'spotting_urination',
-                    'అలసట': 'fatigue',
-                    'బరువు_పెరుగడం': 'weight_gain',
-                    'ఆందోళన': 'anxiety',
-                    'చలి_చేతులు_కాళ్లు': 'cold_hands_and_feets',
-                    'మూడ్_స్వింగ్స్': 'mood_swings',
-                    'బరువు_తగ్గడం': 'weight_loss',
-                    'అశాంతి': 'restlessness',
-                    'బద్ధకం': 'lethargy',
-                    'గొంతులో_పాచెస్': 'patches_in_throat',
-                    'సక్రమంగా_షుగర్_లెవల్': 'irregular_sugar_level',
-                    'దగ్గు': 'cough',
-                    'అధిక_జ్వరము': 'high_fever',
-                    'ముంచిన_కళ్ళు': 'sunken_eyes',
-                    'ఊపిరి_ఆడకపోవడం': 'breathlessness',
-                    'చెమటలు': 'sweating',
-                    'నిర్జలీకరణం': 'dehydration',
-                    'అజీర్ణం': 'indigestion',
-                    'తలనొప్పి': 'headache',
-                    'పసుపురంగు_చర్మం': 'yellowish_skin',
-                    'ముదురు_మూత్రం': 'dark_urine',
-                    'వికారం': 'nausea',
-                    'ఆకలి_లేకపోవడం': 'loss_of_appetite',
-                    'కళ్ల_వెనుక_నొప్పి': 'pain_behind_the_eyes',
-                    'వెన్నునొప్పి': 'back_pain',
-                    'మలబద్ధకం': 'constipation',
-                    'పొత్తికడుపు_నొప్పి': 'abdominal_pain',
-                    'అతిసారం': 'diarrhoea',
-                    'తేలికపాటి_జ్వరం': 'mild_fever',
-                    'పసుపు_మూత్రం': 'yellow_urine',
-                    'కళ్లు_పసుపు_రంగు': 'yellowing_of_eyes',
-                    'తీవ్ర_కాలేయ_వైఫల్యం': 'acute_liver_failure',
-                    'ద్రవ_అధిక_భారం': 'fluid_overload',
-                    'పొత్తికడుపు_వాపు': 'swelling_of_stomach',
-                    'వాపు_లింఫ్_గ్రంధులు': 'swelled_lymph_nodes',
-                    'అస్వస్థత': 'malaise',
-                    'మసకబారిన_దృష్టి': 'blurred_and_distorted_vision',
-                    'కఫం': 'phlegm',
-                    'గొంతు_మంట': 'throat_irritation',
-                    'కళ్ళు_ఎరుపు': 'redness_of_eyes',
-                    'సైనస్_ఒత్తిడి': 'sinus_pressure',
-                    'ముక్కు_కారడం': 'runny_nose',
-                    'కంజెషన్': 'congestion',
-                    'ఛాతీ_నొప్పి': 'chest_pain',
-                    'అవయవాలలో_బలహీనత': 'weakness_in_limbs',
-                    'వేగవంతమైన_గుండె_కొట్టుకోవడం': 'fast_heart_rate',
-                    'మలవిసర్జన_సమయంలో_నొప్పి': 'pain_during_bowel_movements',
-                    'పాయువు_ప్రాంతంలో_నొప్పి': 'pain_in_anal_region',
-                    'రక్తపు_మలం': 'bloody_stool',
-                    'పాయువులో_దురద': 'irritation_in_anus',
-                    'మెడ_నొప్పి': 'neck_pain',
-                    'తలతిరగడం': 'dizziness',
-                    'నొప్పులు': 'cramps',
-                    'గాయాలు': 'bruising',
-                    'బొజ్జ': 'obesity',
-                    'కాళ్ళు_వాపు': 'swollen_legs',
-                    'రక్తనాళాలు_వాపు': 'swollen_blood_vessels',
-                    'ముఖం_కళ్ళు_వాపు': 'puffy_face_and_eyes',
-                    'థైరాయిడ్_పెరుగుదల': 'enlarged_thyroid',
-                    'గోళ్ళు_సులువుగా_విరిగిపోవడం': 'brittle_nails',
-                    'చేతులు_కాళ్ళు_వాపు': 'swollen_extremeties',
-                    'అధిక_ఆకలి': 'excessive_hunger',
-                    'వివాహేతర_సంబంధాలు': 'extra_marital_contacts',
-                    'పెదవులు_ఎండిపోవడం': 'drying_and_tingling_lips',
-                    'మాటలు_తడబడటం': 'slurred_speech',
-                    'మోకాలి_నొప్పి': 'knee_pain',
-                    'తుంటి_నొప్పి': 'hip_joint_pain',
-                    'కండరాల_బలహీనత': 'muscle_weakness',
-                    'మెడ_బిగుసుకుపోవడం': 'stiff_neck',
-                    'కీళ్ళు_వాపు': 'swelling_joints',
-                    'కదలికలో_బిగుసుకుపోవడం': 'movement_stiffness',
-                    'తిరుగుతున్నట్లు_అనిపించడం': 'spinning_movements',
-                    'సమతుల్యత_కోల్పోవడం': 'loss_of_balance',
-                    'అస్థిరత': 'unsteadiness',
-                    'ఒక_వైపు_శరీరం_బలహీనత': 'weakness_of_one_body_side',
-                    'వాసన_తెలియకపోవడం': 'loss_of_smell',
-                    'మూత్రాశయ_అసౌకర్యం': 'bladder_discomfort',
-                    'మూత్రం_దుర్వాసన': 'foul_smell_of_urine',
-                    'నిరంతరం_మూత్రం_వస్తున్నట్లు_అనిపించడం': 'continuous_feel_of_urine',
-                    'వాయువులు_వెళ్ళడం': 'passage_of_gases',
-                    'లోపలి_దురద': 'internal_itching',
-                    'టైఫస్_లక్షణాలు': 'toxic_look_(typhos)',
-                    'నిరాశ': 'depression',
-                    'చిరాకు': 'irritability',
-                    'కండరాల_నొప్పి': 'muscle_pain',
-                    'మార్పు_చెందిన_స్పృహ': 'altered_sensorium',
-                    'శరీరంపై_ఎరుపు_మచ్చలు': 'red_spots_over_body',
-                    'కడుపు_నొప్పి': 'belly_pain',
-                    'అసాధారణ_బహిష్టు': 'abnormal_menstruation',
-                    'చర్మంపై_మచ్చలు': 'dischromic_patches',
-                    'కళ్ళ_నుండి_నీరు_కారడం': 'watering_from_eyes',
-                    'ఆకలి_పెరగడం': 'increased_appetite',
-                    'అధిక_మూత్రం': 'polyuria',
-                    'కుటుంబ_చరిత్ర': 'family_history',
-                    'శ్లేష్మం_కఫం': 'mucoid_sputum',
-                    'తుప్పు_రంగు_కఫం': 'rusty_sputum',
-                    'ఏకాగ్రత_లేకపోవడం': 'lack_of_concentration',
-                    'దృష్టి_సమస్యలు': 'visual_disturbances',
-                    'రక్తమార్పిడి_చేయించుకోవడం': 'receiving_blood_transfusion',
-                    'అపరిశుభ్ర_సూదులు_వాడటం': 'receiving_unsterile_injections',
-                    'కోమా': 'coma',
-                    'కడుపులో_రక్తస్రావం': 'stomach_bleeding',
-                    'పొత్తికడుపు_ఉబ్బరం': 'distention_of_abdomen',
-                    'మద్యం_సేవించే_చరిత్ర': 'history_of_alcohol_consumption',
-                    'ద్రవ_అధిక_భారం': 'fluid_overload',
-                    'కఫంలో_రక్తం': 'blood_in_sputum',
-                    'పిక్కల_సిరలు_వాపు': 'prominent_veins_on_calf',
-                    'గుండె_దడ': 'palpitations',
-                    'నడవడంలో_నొప్పి': 'painful_walking',
-                    'చీము_మొటిమలు': 'pus_filled_pimples',
-                    'నల్లమచ్చలు': 'blackheads',
-                    'చర్మం_గీరడం': 'scurring',
-                    'చర్మం_ఒలవడం': 'skin_peeling',
-                    'వెండి_రంగు_పొడి': 'silver_like_dusting',
-                    'గోళ్ళలో_చిన్న_గుంటలు': 'small_dents_in_nails',
-                    'వాపుతో_కూడిన_గోళ్ళు': 'inflammatory_nails',
-                    'బొబ్బ': 'blister',
-                    'ముక్కు_చుట్టూ_ఎర్రని_పుండు': 'red_sore_around_nose',
-                    'పసుపు_రంగు_కారుతున్న_గాయం': 'yellow_crust_ooze'
-                }
-        }
+        # Severity weight per symptom column, for triage
+        self.severity_weights = load_severity_weights(self.symptoms)
         
-        # Set current language mapping
-        self.symptom_mapping = self.symptom_mappings[self.language]
+        # Phrase automaton and typo index over every language, built by the first view that needs them
+        self.symptom_matcher = None
+        self.fuzzy_matcher = None
         
         # Train the model
         self.train_model()
+
+    @property
+    def df_training(self):
+        """Training data as a DataFrame, built from the binary cache on first access"""
+        if self._df_training is None:
+            self._df_training = self.training_data.frame()
+        return self._df_training
+
+    @classmethod
+    def shared(cls):
+        """Return the process-wide core, building it on first use"""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @timed('train_model')
+    def train_model(self, force=False):
+        """Load the forest from the model store, retraining only if data or params changed"""
+        # The compiled forest loads with NumPy alone; scikit-learn is only needed to train
+        artifact = None if force else self.model_store.load_compiled(TRAINING_FILE, MODEL_PARAMS)
+        if artifact is None:
+            artifact = self.model_store.load_or_train(TRAINING_FILE, MODEL_PARAMS,
+                                                      df_training=self._df_training,
+                                                      force=force)
+        
+        # Predictions made by a replaced forest are no longer valid
+        if getattr(self, 'model_key', artifact['key']) != artifact['key']:
+            prediction_cache.clear()
+        
+        self.classes = artifact['classes']
+        self.model_key = artifact['key']
+        self._model = artifact['model']
+        self._encoder = None
+        
+        # Flattened trees for fast NumPy inference
+        self.forest = artifact['forest']
+        
+        # Alternative engines are fit on first use against the current classes
+        self.backends = {'forest': self.forest}
+        
+        # Unique training profiles and each engine's distribution over them, built lazily
+        self._training_set = None
+        self._profile_index = None
+        self._question_recommender = None
+        self._triage = None
+        self.profile_proba = {}
+
+    @property
+    def model(self):
+        """The fitted scikit-learn forest, unpickled on first access"""
+        if self._model is None:
+            self._model = self.model_store.load_or_train(TRAINING_FILE, MODEL_PARAMS,
+                                                         df_training=self._df_training)['model']
+        return self._model
+
+    @property
+    def encoder(self):
+        """LabelEncoder over the model's classes, for code that expects one"""
+        if self._encoder is None:
+            from sklearn.preprocessing import LabelEncoder
+            encoder = LabelEncoder()
+            encoder.classes_ = self.classes
+            self._encoder = encoder
+        return self._encoder
+
+    @property
+    def training_set(self):
+        """Deduplicated training rows labelled with the model's class codes"""
+        if self._training_set is None:
+            self._training_set = prepare_training_set(self.training_data, classes=self.classes)
+        return self._training_set
+
+    @property
+    def profile_index(self):
+        """Exact and subset index over the unique training profiles"""
+        if self._profile_index is None:
+            self._profile_index = ProfileIndex(self.training_set.X)
+        return self._profile_index
+
+    @property
+    def question_recommender(self):
+        """Symptom-given-condition tables for next-question suggestions"""
+        if self._question_recommender is None:
+            training_set = self.training_set
+            self._question_recommender = QuestionRecommender(
+                training_set.X, training_set.y, training_set.sample_weight, len(self.classes))
+        return self._question_recommender
+
+    @property
+    def triage(self):
+        """Severity scorer over the symptom weights and each condition's typical severity"""
+        if self._triage is None:
+            training_set = self.training_set
+            self._triage = SeverityTriage(self.severity_weights, training_set.X, training_set.y,
+                                          training_set.sample_weight, len(self.classes))
+        return self._triage
+
+    def profile_distributions(self, name):
+        """Engine name's class scores for every indexed profile, computed once"""
+        proba = self.profile_proba.get(name)
+        if proba is None:
+            # One query at a time, so a hit returns exactly what predict_proba_active would
+            engine = self.backend(name)
+            proba = np.array([engine.predict_proba_active(np.flatnonzero(row))
+                              for row in self.training_set.X])
+            proba = self.profile_proba.setdefault(name, proba)
+        return proba
+
+    def backend(self, name):
+        """Return the inference engine called name, fitting it on first use"""
+        engine = self.backends.get(name)
+        if engine is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown backend: {name} (choose from {', '.join(BACKENDS)})")
+            engine = self.backends.setdefault(
+                name, build_backend(name, self.training_set, len(self.classes)))
+        return engine
+
+    def symptom_mask(self, symptoms):
+        """Canonical bitmask of the known symptoms: order, duplicates and unknown names drop out"""
+        symptom_index = self.symptom_index
+        mask = 0
+        for symptom in symptoms:
+            index = symptom_index.get(symptom)
+            if index is not None:
+                mask |= 1 << index
+        return mask
+
+    def mask_symptoms(self, mask):
+        """Symptom names of the bits set in mask, in column order"""
+        symptoms = []
+        while mask:
+            low = mask & -mask
+            symptoms.append(self.symptoms[low.bit_length() - 1])
+            mask ^= low
+        return symptoms
+
+    def encode_symptoms(self, symptom_sets):
+        """Build a dense uint8 symptom matrix, one row per symptom list"""
+        X = np.zeros((len(symptom_sets), len(self.symptoms)), dtype=np.uint8)
+        rows, cols = [], []
+        for row, symptoms in enumerate(symptom_sets):
+            for symptom in symptoms:
+                col = self.symptom_index.get(symptom)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        X[rows, cols] = 1
+        return X
+
+@instrument
+class MedicalChatbot:
+    def __init__(self, language='en', model_store=None, core=None, backend='forest',
+                 max_distance=MAX_DISTANCE):
+        self.language = language
+        self._label_encoder = None
+        
+        # Share one trained core across views unless a custom store is requested
+        if core is None:
+            core = ChatbotCore(model_store) if model_store is not None else ChatbotCore.shared()
+        self.core = core
+        
+        # Inference engine, see backends.BACKENDS; fit now so a bad name fails early
+        self.backend = backend
+        self.core.backend(backend)
+        
+        # Edits tolerated by the typo fallback; 0 turns it off
+        self.max_distance = max_distance
+        
+        self.language_files = LANGUAGE_FILES
         
         # Load language data
         self.load_language_data()
 
+    @property
+    def df_training(self):
+        return self.core.df_training
+
+    @property
+    def symptoms(self):
+        return self.core.symptoms
+
+    @property
+    def model(self):
+        return self.core.model
+
+    @property
+    def encoder(self):
+        return self.core.encoder
+
+    @property
+    def classes(self):
+        return self.core.classes
+
+    @property
+    def label_encoder(self):
+        """Encoder fit by ensure_consistent_diseases; scikit-learn is imported on first use"""
+        if self._label_encoder is None:
+            from sklearn.preprocessing import LabelEncoder
+            self._label_encoder = LabelEncoder()
+        return self._label_encoder
+
+    @property
+    def model_key(self):
+        return self.core.model_key
+
+    @property
+    def engine(self):
+        """The core's inference engine for this view's backend"""
+        return self.core.backend(self.backend)
+
+    @property
+    def disease_mappings(self):
+        """English-to-localized disease names for every language, from the shared lexicon"""
+        return Lexicon.shared().diseases
+
     def change_language(self, new_language):
         """Change the chatbot's language"""
         self.language = new_language
-        self.symptom_mapping = self.symptom_mappings[self.language]
         self.load_language_data()
 
+    def language_table(self, name):
+        """The current language's 'description', 'precaution' or 'severity' DataFrame, read on first access"""
+        resources = self.language_resources
+        if resources[name] is None:
+            import pandas as pd
+            resources[name] = pd.read_csv(self.language_files[resources['language']][name],
+                                          encoding='utf-8',
+                                          on_bad_lines='skip')
+        return resources[name]
+
+    @property
+    def df_description(self):
+        return self.language_table('description')
+
+    @property
+    def df_precaution(self):
+        return self.language_table('precaution')
+
+    @property
+    def df_severity(self):
+        return self.language_table('severity')
+
+    @timed('load_language_data')
     def load_language_data(self):
-        """Load datasets for current language"""
+        """Load datasets for current language, reading them from disk only on first use"""
+        cached = language_cache.get((self.language, self.model_key))
+        if cached is not None:
+            self.language_resources = cached
+            self.symptom_mapping = cached['symptom_mapping']
+            self.condition_names = cached['condition_names']
+            self.symptom_names = cached['symptom_names']
+            self.description_index = cached['description_index']
+            self.precaution_index = cached['precaution_index']
+            return
+        
         files = self.language_files[self.language]
         
         try:
-            # Load language-specific datasets with error handling
-            self.df_description = pd.read_csv(files['description'], 
-                                            encoding='utf-8',
-                                            on_bad_lines='skip')  # Skip problematic lines
-            
-            self.df_precaution = pd.read_csv(files['precaution'], 
-                                            encoding='utf-8',
-                                            on_bad_lines='skip')
-            
-            self.df_severity = pd.read_csv(files['severity'], 
-                                         encoding='utf-8',
-                                         on_bad_lines='skip')
+            # Read the language tables with the csv module; the DataFrames are only built on request
+            descriptions = read_table(files['description'])
+            precautions = read_table(files['precaution'])
             
             # Create language-specific symptom mappings
             self.create_symptom_mappings()
             
+            # Display name for every model class index
+            disease_names = Lexicon.shared().disease_names(self.language)
+            self.condition_names = [
+                disease_names.get(condition, condition)
+                for condition in self.classes
+            ]
+            
+            # Display name for every symptom: its first localized phrase, else the readable column name
+            self.symptom_names = {symptom: symptom.replace('_', ' ') for symptom in self.symptoms}
+            for phrase, symptom in reversed(Lexicon.shared().symptom_phrases(self.language).items()):
+                self.symptom_names[symptom] = phrase
+            
+            # Constant-time description and precaution lookups
+            self.build_disease_index(descriptions, precautions)
+            
+            # The DataFrames are unused on the hot path, so they are read lazily
+            self.language_resources = {
+                'language': self.language,
+                'description': None,
+                'precaution': None,
+                'severity': None,
+                'symptom_mapping': self.symptom_mapping,
+                'condition_names': self.condition_names,
+                'symptom_names': self.symptom_names,
+                'description_index': self.description_index,
+                'precaution_index': self.precaution_index
+            }
+            language_cache.put((self.language, self.model_key), self.language_resources)
+            
         except Exception as e:
             print(f"Error loading language data: {str(e)}")
             # Fallback to English if there's an error
@@ -440,336 +388,121 @@ class MedicalChatbot:
                 self.language = 'en'
                 self.load_language_data()
 
+    def build_disease_index(self, descriptions, precautions):
+        """Compile the description and precaution table rows into dicts keyed by disease name"""
+        self.description_index = {}
+        for row in descriptions:
+            disease, description = row.get('disease'), row.get('description')
+            if disease is not None and description is not None:
+                self.description_index.setdefault(normalize_disease_name(disease), description)
+        
+        no_precautions = [self.get_language_text('no_precautions')]
+        columns = [f'Precaution_{i}' for i in range(1, 5)]
+        self.precaution_index = {}
+        for row in precautions:
+            disease = row.get('Disease')
+            if disease is None:
+                continue
+            entries = [p.strip() for p in (row.get(c) for c in columns) if p is not None and p.strip()]
+            self.precaution_index.setdefault(normalize_disease_name(disease),
+                                             entries or no_precautions)
+        
+        # Resolve English names and the exact names predict_condition returns
+        # to the same entries as the localized table names
+        localized = Lexicon.shared().disease_names(self.language)
+        for english, name in zip(self.classes, self.condition_names):
+            candidates = (normalize_disease_name(english),
+                          normalize_disease_name(localized.get(english.strip(), english)))
+            for index in (self.description_index, self.precaution_index):
+                entry = next((index[key] for key in candidates if key in index), None)
+                if entry is not None:
+                    for alias in (english, name) + candidates:
+                        index.setdefault(alias, entry)
+
     def create_symptom_mappings(self):
         """Create symptom mappings for current language"""
-        # Base English mappings
-        self.symptom_mapping = {
-            symptom.lower().replace('_', ' '): symptom 
+        self.symptom_mapping = self.build_symptom_mapping(self.language)
+
+    def build_symptom_mapping(self, language):
+        """Build the phrase-to-symptom mapping for a language"""
+        # Base English mappings, keyed like tokenized input
+        symptom_mapping = {
+            normalize_phrase(symptom, language): symptom 
             for symptom in self.symptoms
         }
         
-        # Language-specific mappings
-        if self.language == 'hi':
-            self.symptom_mapping.update({
-                'खुजली': 'itching',
-                'त्वचा पर चकत्ते': 'skin_rash',
-                'गांठदार त्वचा पर दाने': 'nodal_skin_eruptions',
-                'लगातार छींक आना': 'continuous_sneezing',
-                'कंपकंपी': 'shivering',
-                'ठंड लगना': 'chills',
-                'जोड़ों में दर्द': 'joint_pain',
-                'पेट में दर्द': 'stomach_pain',
-                'एसिडिटी': 'acidity',
-                'जीभ पर छाले': 'ulcers_on_tongue',
-                'मांसपेशियों में कमजोरी': 'muscle_wasting',
-                'उल्टी': 'vomiting',
-                'पेशाब में जलन': 'burning_micturition',
-                'दाग-धब्बे पेशाब': 'spotting_urination',
-                'थकान': 'fatigue',
-                'वजन बढ़ना': 'weight_gain',
-                'चिंता': 'anxiety',
-                'ठंडे हाथ और पैर': 'cold_hands_and_feets',
-                'मूड में बदलाव': 'mood_swings',
-                'वजन घटना': 'weight_loss',
-                'बेचैनी': 'restlessness',
-                'सुस्ती': 'lethargy',
-                'गले में पैच': 'patches_in_throat',
-                'अनियमित शुगर स्तर': 'irregular_sugar_level',
-                'खांसी': 'cough',
-                'तेज बुखार': 'high_fever',
-                'धँसी हुई आँखें': 'sunken_eyes',
-                'सांस फूलना': 'breathlessness',
-                'पसीना': 'sweating',
-                'निर्जलीकरण': 'dehydration',
-                'अपच': 'indigestion',
-                'सिरदर्द': 'headache',
-                'त्वचा का पीला पड़ना': 'yellowish_skin',
-                'गहरे रंग का मूत्र': 'dark_urine',
-                'मतली': 'nausea',
-                'भूख न लगना': 'loss_of_appetite',
-                'आँखों के पीछे दर्द': 'pain_behind_the_eyes',
-                'पीठ दर्द': 'back_pain',
-                'कब्ज': 'constipation',
-                'पेट दर्द': 'abdominal_pain',
-                'दस्त': 'diarrhoea',
-                'हल्का बुखार': 'mild_fever',
-                'पेशाब पीला': 'yellow_urine',
-                'आँखों का पीला होना': 'yellowing_of_eyes',
-                'तीव्र यकृत विफलता': 'acute_liver_failure',
-                'तरल पदार्थ की अधिकता': 'fluid_overload',
-                'पेट का फूलना': 'swelling_of_stomach',
-                'लिम्फ नोड्स में सूजन': 'swelled_lymph_nodes',
-                'अस्वस्थता': 'malaise',
-                'धुंधली और विकृत दृष्टि': 'blurred_and_distorted_vision',
-                'कफ': 'phlegm',
-                'गले में जलन': 'throat_irritation',
-                'आंखों की लाली': 'redness_of_eyes',
-                'साइनस का दबाव': 'sinus_pressure',
-                'नाक बहना': 'runny_nose',
-                'कब्ज': 'congestion',
-                'सीने में दर्द': 'chest_pain',
-                'अंगों में कमजोरी': 'weakness_in_limbs',
-                'दिल की तेज़ गति': 'fast_heart_rate',
-                'मल त्याग के दौरान दर्द': 'pain_during_bowel_movements',
-                'गुदा क्षेत्र में दर्द': 'pain_in_anal_region',
-                'मल में खून': 'bloody_stool',
-                'गुदा में जलन': 'irritation_in_anus',
-                'गर्दन में दर्द': 'neck_pain',
-                'चक्कर आना': 'dizziness',
-                'ऐंठन': 'cramps',
-                'चोट': 'bruising',
-                'मोटापा': 'obesity',
-                'सूजे हुए पैर': 'swollen_legs',
-                'सूजी हुई रक्त वाहिकाएं': 'swollen_blood_vessels',
-                'फूला हुआ चेहरा और आंखें': 'puffy_face_and_eyes',
-                'बढ़ा हुआ थायरॉइड': 'enlarged_thyroid',
-                'भंगुर नाखून': 'brittle_nails',
-                'सूजे हुए हाथ-पैर': 'swollen_extremeties',
-                'अत्यधिक भूख': 'excessive_hunger',
-                'विवाहेतर संपर्क': 'extra_marital_contacts',
-                'होठों का सूखना और झुनझुनी': 'drying_and_tingling_lips',
-                'अस्पष्ट बोलना': 'slurred_speech',
-                'घुटनों का दर्द': 'knee_pain',
-                'कूल्हे के जोड़ों का दर्द': 'hip_joint_pain',
-                'मांसपेशियों में कमजोरी': 'muscle_weakness',
-                'गर्दन में अकड़न': 'stiff_neck',
-                'जोड़ों में सूजन': 'swelling_joints',
-                'गति में कठोरता': 'movement_stiffness',
-                'घूमना': 'spinning_movements',
-                'संतुलन खोना': 'loss_of_balance',
-                'अस्थिरता': 'unsteadiness',
-                'शरीर के एक तरफ की कमजोरी': 'weakness_of_one_body_side',
-                'गंध की हानि': 'loss_of_smell',
-                'मूत्राशय में असुविधा': 'bladder_discomfort',
-                'मूत्र की दुर्गंध': 'foul_smell_of_urine',
-                'लगातार पेशाब का अहसास': 'continuous_feel_of_urine',
-                'गैसों का निकलना': 'passage_of_gases',
-                'आंतरिक खुजली': 'internal_itching',
-                'विषैला रूप (टाइफोस)': 'toxic_look_(typhos)',
-                'अवसाद': 'depression',
-                'चिड़चिड़ापन': 'irritability',
-                'मांसपेशियों में दर्द': 'muscle_pain',
-                'संवेदी संवेदना में बदलाव': 'altered_sensorium',
-                'शरीर पर लाल धब्बे': 'red_spots_over_body',
-                'पेट में दर्द': 'belly_pain',
-                'असामान्य मासिक धर्म': 'abnormal_menstruation',
-                'त्वचा पर धब्बे': 'dischromic_patches',
-                'आँखों से पानी आना': 'watering_from_eyes',
-                'भूख बढ़ना': 'increased_appetite',
-                'बहुमूत्रता': 'polyuria',
-                'पारिवारिक इतिहास': 'family_history',
-                'श्लेष्मा बलगम': 'mucoid_sputum',
-                'जंग लगा बलगम': 'rusty_sputum',
-                'एकाग्रता की कमी': 'lack_of_concentration',
-                'दृष्टि विकार': 'visual_disturbances',
-                'रक्त चढ़ाना': 'receiving_blood_transfusion',
-                'अस्वच्छ इंजेक्शन': 'receiving_unsterile_injections',
-                'कोमा': 'coma',
-                'पेट से रक्तस्राव': 'stomach_bleeding',
-                'पेट का फूलना': 'distention_of_abdomen',
-                'शराब पीने का इतिहास': 'history_of_alcohol_consumption',
-                'तरल पदार्थ अधिकता': 'fluid_overload',
-                'बलगम में खून': 'blood_in_sputum',
-                'पिंडली की उभरी नसें': 'prominent_veins_on_calf',
-                'धड़कन': 'palpitations',
-                'चलने में दर्द': 'painful_walking',
-                'मवाद भरे फुंसी': 'pus_filled_pimples',
-                'ब्लैकहेड्स': 'blackheads',
-                'त्वचा खरोंच': 'scurring',
-                'त्वचा का छिलना': 'skin_peeling',
-                'चांदी जैसी धूल': 'silver_like_dusting',
-                'नाखूनों में छोटे गड्ढे': 'small_dents_in_nails',
-                'सूजे हुए नाखून': 'inflammatory_nails',
-                'छाला': 'blister',
-                'नाक के आसपास लाल घाव': 'red_sore_around_nose',
-                'पीली पपड़ी': 'yellow_crust_ooze'
-            })
+        # Language-specific phrases from the shared lexicon, already normalized
+        symptom_mapping.update(Lexicon.shared().symptom_phrases(language))
         
-        elif self.language == 'te':
-            self.symptom_mapping.update({
-                    'దురద': 'itching',
-                    'చర్మం_దద్దుర్లు': 'skin_rash',
-                    'నోడల్_చర్మం_విస్ఫోటనాలు': 'nodal_skin_eruptions',
-                    'నిరంతర_తుమ్ములు': 'continuous_sneezing',
-                    'వణుకు': 'shivering',
-                    'చలి': 'chills',
-                    'కీళ్ల_నొప్పి': 'joint_pain',
-                    'కడుపు_నొప్పి': 'stomach_pain',
-                    'ఆమ్లత్వం': 'acidity',
-                    'నాలుకపై_పూత': 'ulcers_on_tongue',
-                    'కండరాలు_వ్యర్థం': 'muscle_wasting',
-                    'వాంతులు': 'vomiting',
-                    'మంట_మూత్రవిసర్జన': 'burning_micturition',
-                    'మచ్చలు మూత్రవిసర్జన': 'spotting_urination',
-                    'అలసట': 'fatigue',
-                    'బరువు_పెరుగడం': 'weight_gain',
-                    'ఆందోళన': 'anxiety',
-                    'చలి_చేతులు_కాళ్లు': 'cold_hands_and_feets',
-                    'మూడ్_స్వింగ్స్': 'mood_swings',
-                    'బరువు_తగ్గడం': 'weight_loss',
-                    'అశాంతి': 'restlessness',
-                    'బద్ధకం': 'lethargy',
-                    'గొంతులో_పాచెస్': 'patches_in_throat',
-                    'సక్రమంగా_షుగర్_లెవల్': 'irregular_sugar_level',
-                    'దగ్గు': 'cough',
-                    'అధిక_జ్వరము': 'high_fever',
-                    'ముంచిన_కళ్ళు': 'sunken_eyes',
-                    'ఊపిరి_ఆడకపోవడం': 'breathlessness',
-                    'చెమటలు': 'sweating',
-                    'నిర్జలీకరణం': 'dehydration',
-                    'అజీర్ణం': 'indigestion',
-                    'తలనొప్పి': 'headache',
-                    'పసుపురంగు_చర్మం': 'yellowish_skin',
-                    'ముదురు_మూత్రం': 'dark_urine',
-                    'వికారం': 'nausea',
-                    'ఆకలి_లేకపోవడం': 'loss_of_appetite',
-                    'కళ్ల_వెనుక_నొప్పి': 'pain_behind_the_eyes',
-                    'వెన్నునొప్పి': 'back_pain',
-                    'మలబద్ధకం': 'constipation',
-                    'పొత్తికడుపు_నొప్పి': 'abdominal_pain',
-                    'అతిసారం': 'diarrhoea',
-                    'తేలికపాటి_జ్వరం': 'mild_fever',
-                    'పసుపు_మూత్రం': 'yellow_urine',
-                    'కళ్లు_పసుపు_రంగు': 'yellowing_of_eyes',
-                    'తీవ్ర_కాలేయ_వైఫల్యం': 'acute_liver_failure',
-                    'ద్రవ_అధిక_భారం': 'fluid_overload',
-                    'పొత్తికడుపు_వాపు': 'swelling_of_stomach',
-                    'వాపు_లింఫ్_గ్రంధులు': 'swelled_lymph_nodes',
-                    'అస్వస్థత': 'malaise',
-                    'మసకబారిన_దృష్టి': 'blurred_and_distorted_vision',
-                    'కఫం': 'phlegm',
-                    'గొంతు_మంట': 'throat_irritation',
-                    'కళ్ళు_ఎరుపు': 'redness_of_eyes',
-                    'సైనస్_ఒత్తిడి': 'sinus_pressure',
-                    'ముక్కు_కారడం': 'runny_nose',
-                    'కంజెషన్': 'congestion',
-                    'ఛాతీ_నొప్పి': 'chest_pain',
-                    'అవయవా���లో_బలహీనత': 'weakness_in_limbs',
-                    'వేగవంతమైన_గుండె_కొట్టుకోవడం': 'fast_heart_rate',
-                    'మలవిసర్జన_సమయంలో_నొప్పి': 'pain_during_bowel_movements',
-                    'పాయువు_ప్రాంతంలో_నొప్పి': 'pain_in_anal_region',
-                    'రక్తపు_మలం': 'bloody_stool',
-                    'పాయువులో_దురద': 'irritation_in_anus',
-                    'మెడ_నొప్పి': 'neck_pain',
-                    'తలతిరగడం': 'dizziness',
-                    'నొప్పులు': 'cramps',
-                    'గాయాలు': 'bruising',
-                    'బొజ్జ': 'obesity',
-                    'కాళ్ళు_వాపు': 'swollen_legs',
-                    'రక్తనాళాలు_వాపు': 'swollen_blood_vessels',
-                    'ముఖం_కళ్ళు_వాపు': 'puffy_face_and_eyes',
-                    'థైరాయిడ్_పెరుగుదల': 'enlarged_thyroid',
-                    'గోళ్ళు_సులువుగా_విరిగిపోవడం': 'brittle_nails',
-                    'చేతులు_కాళ్ళు_వాపు': 'swollen_extremeties',
-                    'అధిక_ఆకలి': 'excessive_hunger',
-                    'వివాహేతర_సంబంధాలు': 'extra_marital_contacts',
-                    'పెదవులు_ఎండిపోవడం': 'drying_and_tingling_lips',
-                    'మాటలు_తడబడటం': 'slurred_speech',
-                    'మోకాలి_నొప్పి': 'knee_pain',
-                    'తుంటి_నొప్పి': 'hip_joint_pain',
-                    'కండరాల_బలహీనత': 'muscle_weakness',
-                    'మెడ_బిగుసుకుపోవడం': 'stiff_neck',
-                    'కీళ్ళు_వాపు': 'swelling_joints',
-                    'కదలికలో_బిగుసుకుపోవడం': 'movement_stiffness',
-                    'తిరుగుతున్నట్లు_అనిపించడం': 'spinning_movements',
-                    'సమతుల్యత_కోల్పోవడం': 'loss_of_balance',
-                    'అస్థిరత': 'unsteadiness',
-                    'ఒక_వైపు_శరీరం_బలహీనత': 'weakness_of_one_body_side',
-                    'వాసన_తెలియకపోవడం': 'loss_of_smell',
-                    'మూత్రాశయ_అసౌకర్యం': 'bladder_discomfort',
-                    'మూత్రం_దుర్వాసన': 'foul_smell_of_urine',
-                    'నిరంతరం_మూత్రం_వస్తున్నట్లు_అనిపించడం': 'continuous_feel_of_urine',
-                    'వాయువులు_వెళ్ళడం': 'passage_of_gases',
-                    'లోపలి_దురద': 'internal_itching',
-                    'టైఫస్_లక్షణాలు': 'toxic_look_(typhos)',
-                    'నిరాశ': 'depression',
-                    'చిరాకు': 'irritability',
-                    'కండరాల_నొప్పి': 'muscle_pain',
-                    'మార్పు_చెందిన_స్పృహ': 'altered_sensorium',
-                    'శరీరంపై_ఎరుపు_మచ్చలు': 'red_spots_over_body',
-                    'కడుపు_నొప్పి': 'belly_pain',
-                    'అసాధారణ_బహిష్టు': 'abnormal_menstruation',
-                    'చర్మంపై_మచ్చలు': 'dischromic_patches',
-                    'కళ్ళ_నుండి_నీరు_కారడం': 'watering_from_eyes',
-                    'ఆకలి_పెరగడం': 'increased_appetite',
-                    'అధిక_మూత్రం': 'polyuria',
-                    'కుటుంబ_చరిత్ర': 'family_history',
-                    'శ్లేష్మం_కఫం': 'mucoid_sputum',
-                    'తుప్పు_రంగు_కఫం': 'rusty_sputum',
-                    'ఏకాగ్రత_లేకపోవడం': 'lack_of_concentration',
-                    'దృష్టి_సమస్యలు': 'visual_disturbances',
-                    'రక్తమార్పిడి_చేయించుకోవడం': 'receiving_blood_transfusion',
-                    'అపరిశుభ్ర_సూదులు_వాడటం': 'receiving_unsterile_injections',
-                    'కోమా': 'coma',
-                    'కడుపులో_రక్తస్రావం': 'stomach_bleeding',
-                    'పొత్తికడుపు_ఉబ్బరం': 'distention_of_abdomen',
-                    'మద్యం_సేవించే_చరిత్ర': 'history_of_alcohol_consumption',
-                    'ద్రవ_అధిక_భారం': 'fluid_overload',
-                    'కఫంలో_రక్తం': 'blood_in_sputum',
-                    'పిక్కల_సిరలు_వాపు': 'prominent_veins_on_calf',
-                    'గుండె_దడ': 'palpitations',
-                    'నడవడంలో_నొప్పి': 'painful_walking',
-                    'చీము_మొటిమలు': 'pus_filled_pimples',
-                    'నల్లమచ్చలు': 'blackheads',
-                    'చర్మం_గీరడం': 'scurring',
-                    'చర్మం_ఒలవడం': 'skin_peeling',
-                    'వెండి_రంగు_పొడి': 'silver_like_dusting',
-                    'గోళ్ళలో_చిన్న_గుంటలు': 'small_dents_in_nails',
-                    'వాపుతో_కూడిన_గోళ్ళు': 'inflammatory_nails',
-                    'బొబ్బ': 'blister',
-                    'ముక్కు_చుట్టూ_ఎర్రని_పుండు': 'red_sore_around_nose',
-                    'పసుపు_రంగు_కారుతున్న_గాయం': 'yellow_crust_ooze'  
+        return symptom_mapping
+
+    @property
+    def symptom_matcher(self):
+        """Phrase automaton shared by every view of the core"""
+        if self.core.symptom_matcher is None:
+            self.core.symptom_matcher = SymptomMatcher({
+                language: self.build_symptom_mapping(language)
+                for language in self.language_files
             })
+        return self.core.symptom_matcher
 
+    @property
+    def fuzzy_matcher(self):
+        """Trigram typo index shared by every view of the core"""
+        if self.core.fuzzy_matcher is None:
+            self.core.fuzzy_matcher = FuzzyMatcher({
+                language: self.build_symptom_mapping(language)
+                for language in self.language_files
+            })
+        return self.core.fuzzy_matcher
+
+    @timed('extract_symptoms_from_text')
     def extract_symptoms_from_text(self, text):
         """Extract symptoms from text in current language"""
-        text = text.lower().strip()
-        extracted_symptoms = set()
-        
-        # Remove common words based on language
-        common_words = {
-            'en': {'i', 'am', 'have', 'having', 'with', 'and', 'also', 'feeling'},
-            'hi': {'मुझे', 'है', 'हैं', 'और', 'भी', 'महसूस', 'कर', 'रहा', 'रही'},
-            'te': {'నాకు', 'ఉంది', 'మరియు', 'కూడా', 'అనిపిస్తోంది'}
-        }[self.language]
+        # Normalized words without the language's stop words
+        tokens = tokenize(text, self.language)
         
-        # Clean text
-        words = [w for w in text.split() if w not in common_words]
-        cleaned_text = ' '.join(words)
+        # Find every symptom phrase in one pass over the token text
+        found = {}
+        covered = [False] * len(tokens)
+        for start, end, symptom in self.symptom_matcher.match_spans(tokens.text, self.language):
+            found.setdefault(symptom, start)
+            for index in tokens.word_range(start, end):
+                covered[index] = True
         
-        # Check for symptoms in cleaned text
-        for local_term, eng_symptom in self.symptom_mapping.items():
-            if local_term in cleaned_text:
-                extracted_symptoms.add(eng_symptom)
+        # Typo fallback over each run of words no phrase touched
+        if self.max_distance:
+            runs = []
+            for index, is_covered in enumerate(covered):
+                if is_covered:
+                    continue
+                if runs and runs[-1][-1] == index - 1:
+                    runs[-1].append(index)
+                else:
+                    runs.append([index])
+            for run in runs:
+                matches = self.fuzzy_matcher.find_symptoms([tokens.words[i] for i in run],
+                                                           self.language, self.max_distance)
+                for position, symptom in matches:
+                    found.setdefault(symptom, tokens.starts[run[position]])
         
-        return list(extracted_symptoms)
+        return sorted(found, key=found.get)
 
+    @timed('get_description')
     def get_description(self, condition):
         """Get description in current language"""
-        try:
-            description = self.df_description[
-                self.df_description['disease'].str.strip() == condition.strip()
-            ]['description'].values[0]
-            return description
-        except:
-            return self.get_language_text('no_description')
+        description = self.description_index.get(condition)
+        if description is None:
+            description = self.description_index.get(normalize_disease_name(condition))
+        return description if description is not None else self.get_language_text('no_description')
 
+    @timed('get_precautions')
     def get_precautions(self, condition):
         """Get precautions in current language"""
-        try:
-            precautions = []
-            row = self.df_precaution[
-                self.df_precaution['Disease'].str.strip() == condition.strip()
-            ]
-            
-            for i in range(1, 5):
-                precaution = row[f'Precaution_{i}'].values[0]
-                if isinstance(precaution, str) and precaution.strip():
-                    precautions.append(precaution.strip())
-            
-            return precautions if precautions else [self.get_language_text('no_precautions')]
-        except:
-            return [self.get_language_text('no_precautions')]
+        precautions = self.precaution_index.get(condition)
+        if precautions is None:
+            precautions = self.precaution_index.get(normalize_disease_name(condition))
+        return precautions if precautions is not None else [self.get_language_text('no_precautions')]
 
     def get_language_text(self, key):
         """Get language-specific text"""
@@ -792,75 +525,133 @@ class MedicalChatbot:
         }
         return texts[self.language][key]
 
-    def train_model(self):
-        # Prepare training data
-        X = self.df_training.drop('prognosis', axis=1)
-        y = self.df_training['prognosis']
+    def train_model(self, force=False):
+        """Retrain (or reload) the shared core's forest"""
+        self.core.train_model(force=force)
+
+    def active_symptoms(self, symptoms):
+        """Sorted column indices of the known symptoms that are present"""
+        symptom_index = self.core.symptom_index
+        return sorted({symptom_index[s] for s in symptoms if s in symptom_index})
+
+    def condition_scores(self, symptoms, mask=None):
+        """The engine's score for every class given the symptoms"""
+        if mask is None:
+            mask = self.core.symptom_mask(symptoms)
         
-        # Encode disease labels
-        self.encoder = LabelEncoder()
-        y = self.encoder.fit_transform(y)
+        # A known training profile already has its distribution precomputed
+        row = self.core.profile_index.lookup(mask)
+        if row is not None:
+            return self.core.profile_distributions(self.backend)[row]
         
-        # Train Random Forest model
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.model.fit(X, y)
+        # Get prediction probabilities from the selected engine
+        return self.engine.predict_proba_active(self.active_symptoms(symptoms))
 
+    @timed('predict_condition')
     def predict_condition(self, symptoms):
-        # Create input vector
-        input_vector = pd.DataFrame(0, index=[0], columns=self.symptoms)
-        for symptom in symptoms:
-            if symptom in self.symptoms:
-                input_vector[symptom] = 1
+        mask = self.core.symptom_mask(symptoms)
+        key = (self.model_key, self.backend, self.language, 3, mask)
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            return list(cached)
         
-        # Get prediction probabilities
-        prediction_proba = self.model.predict_proba(input_vector)[0]
-        prediction = self.model.predict(input_vector)[0]
+        prediction_proba = self.condition_scores(symptoms, mask)
         
         # Get top 3 predictions with their probabilities
-        top_3_indices = prediction_proba.argsort()[-3:][::-1]
-        top_3_predictions = []
-        
-        for idx in top_3_indices:
-            condition = self.encoder.inverse_transform([idx])[0]
-            if self.language != 'en':
-                condition = self.disease_mappings[self.language].get(condition, condition)
-            confidence = prediction_proba[idx] * 100
-            top_3_predictions.append((condition, confidence))
+        top_3_predictions = self.rank_conditions(prediction_proba, 3)
         
+        prediction_cache.put(key, tuple(top_3_predictions))
         return top_3_predictions
 
+    def rank_conditions(self, scores, k=3):
+        """(condition, confidence in percent) for the k best-scoring classes, highest first"""
+        return [(self.condition_names[idx], scores[idx] * 100) for idx in top_k(scores, k)]
+
+    @timed('predict_with_triage')
+    def predict_with_triage(self, symptoms, top_k=3):
+        """Top-k predictions and triage for one symptom list, from a single engine call"""
+        scores = self.condition_scores(symptoms)
+        return self.rank_conditions(scores, top_k), self.assess_triage(symptoms, top_k, scores)
+
+    @timed('predict_conditions_batch')
+    def predict_conditions_batch(self, symptom_sets, top_k=3):
+        """Predict many symptom lists in one engine call, one top-k list per input"""
+        if not symptom_sets:
+            return []
+        
+        # Serve repeated symptom sets from the cache and run the rest together
+        keys = [(self.model_key, self.backend, self.language, top_k, self.core.symptom_mask(symptoms))
+                for symptoms in symptom_sets]
+        results = [prediction_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing:
+            # Known profiles come from the index; only the rest go through the engine
+            profile_index = self.core.profile_index
+            rows = [profile_index.lookup(keys[i][-1]) for i in missing]
+            known = [j for j, row in enumerate(rows) if row is not None]
+            unknown = [j for j, row in enumerate(rows) if row is None]
+            prediction_proba = np.empty((len(missing), len(self.condition_names)))
+            if known:
+                distributions = self.core.profile_distributions(self.backend)
+                prediction_proba[known] = distributions[[rows[j] for j in known]]
+            if unknown:
+                X = self.core.encode_symptoms([symptom_sets[missing[j]] for j in unknown])
+                prediction_proba[unknown] = self.engine.predict_proba(X)
+            top_indices = top_k_rows(prediction_proba, top_k)
+            confidences = np.take_along_axis(prediction_proba, top_indices, axis=1) * 100
+            for i, row_indices, row_confidences in zip(missing, top_indices, confidences):
+                results[i] = tuple((self.condition_names[idx], confidence)
+                                   for idx, confidence in zip(row_indices, row_confidences))
+                prediction_cache.put(keys[i], results[i])
+        
+        return [list(result) for result in results]
+
     def find_matching_symptom(self, text):
         """Find matching symptoms from text"""
-        text = text.lower().strip()
-        matches = []
+        text = tokenize(text, self.language).text
         
         # Check direct matches in symptom phrases
         if text in self.symptom_mapping:
             return [self.symptom_mapping[text]]
         
-        # Check for partial matches
-        for phrase, symptom in self.symptom_mapping.items():
-            if phrase in text or text in phrase:
-                matches.append(symptom)
+        # Phrases inside the text, then the text inside phrases. The English
+        # symptom names are part of every language's mapping, so this also
+        # covers the original symptom list.
+        matches = self.symptom_matcher.find_symptoms(text, self.language, word_boundary=False)
+        matches += self.symptom_matcher.find_phrases_containing(text, self.language)
         
-        # Check original symptom list
-        for symptom in self.symptoms:
-            symptom_normalized = symptom.replace('_', ' ')
-            if text in symptom_normalized or symptom_normalized in text:
-                matches.append(symptom)
+        # Closest phrases when nothing matched as typed
+        distance = allowed_distance(text, self.max_distance)
+        if not matches and distance:
+            matches = [symptom for symptom, _ in self.fuzzy_matcher.lookup(text, self.language, distance)]
         
         return list(set(matches))  # Remove duplicates
 
+    @timed('assess_triage')
+    def assess_triage(self, symptoms, top_k=3, scores=None):
+        """Severity score in [0, 1] and urgency tier for the symptoms and their top_k conditions.
+
+        scores are the symptoms' condition_scores, if the caller already has them.
+        """
+        if scores is None:
+            scores = self.condition_scores(symptoms)
+        return self.core.triage.assess(self.active_symptoms(symptoms), scores, top_k)
+
+    @timed('suggest_symptoms')
+    def suggest_symptoms(self, symptoms, count=2, scores=None):
+        """Up to count unreported symptoms that would best separate the likeliest conditions"""
+        active = self.active_symptoms(symptoms)
+        if scores is None:
+            scores = self.condition_scores(symptoms)
+        return [self.symptoms[i] for i, _ in self.core.question_recommender.recommend(scores, active, count)]
+
     def ensure_consistent_diseases(self):
         """Ensure disease names are consistent across all language datasets"""
         try:
             # Clean disease names in training data
             self.df_training['prognosis'] = self.df_training['prognosis'].str.strip()
-            self.df_training['prognosis'] = self.df_training['prognosis'].replace({
-                'Dimorphic hemmorhoids(piles)': 'Dimorphic hemorrhoids(piles)',
-                'Hypertension ': 'Hypertension',
-                'Diabetes ': 'Diabetes'
-            })
+            self.df_training['prognosis'] = self.df_training['prognosis'].replace(DISEASE_NAME_FIXES)
             
             # Clean disease names in description data
             self.df_description['disease'] = self.df_description['disease'].str.strip()
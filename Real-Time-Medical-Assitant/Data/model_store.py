@@ -0,0 +1,175 @@
+"""Persisted model artifacts for the medical chatbot.
+
+Artifacts are keyed by a hash of the training file, the model
+hyperparameters, the scikit-learn version and the training data
+preparation, so the forest is only retrained when one of those changes.
+
+Next to each joblib artifact a compiled-<id>.npz holds the flattened
+CompiledForest arrays, class names and symptom columns. Its id leaves the
+scikit-learn version out, so load_compiled can find it without importing
+scikit-learn, joblib or pandas. That is the whole inference path; the
+heavy libraries are imported only to train or to unpickle the fitted
+forest.
+
+Prebuild the artifact during deploy (run from Real-Time-Medical-Assitant/):
+
+    python Data/model_store.py
+    python Data/model_store.py --force
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from dataset import load_dataset, write_atomic
+from forest_engine import CompiledForest
+from training_data import PREPARATION, fit_forest, prepare_training_set
+
+TRAINING_FILE = 'Data/Training.csv'
+MODEL_DIR = 'Data/models'
+MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+
+
+def build_artifact(df_training, params):
+    """Fit the forest on the deduplicated, weighted training rows and return it as an artifact dict"""
+    training_set = prepare_training_set(df_training)
+    model = fit_forest(training_set, params)
+
+    return {
+        'model': model,
+        'classes': training_set.classes,
+        'symptoms': training_set.symptoms,
+        'params': dict(params),
+        'training_rows': training_set.n_source_rows,
+        'unique_rows': len(training_set.y)
+    }
+
+
+class ModelStore:
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+
+    def artifact_key(self, training_path, params):
+        """Content-address an artifact by training data and hyperparameters"""
+        import sklearn
+        digest = hashlib.sha256()
+        digest.update(load_dataset(training_path).digest.encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(sklearn.__version__.encode())
+        digest.update(PREPARATION.encode())
+        return digest.hexdigest()[:16]
+
+    def artifact_path(self, key):
+        return os.path.join(self.model_dir, f'forest-{key}.joblib')
+
+    def compiled_id(self, training_path, params):
+        """Address of the compiled forest; like artifact_key, minus the scikit-learn version"""
+        digest = hashlib.sha256()
+        digest.update(load_dataset(training_path).digest.encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(PREPARATION.encode())
+        return digest.hexdigest()[:16]
+
+    def compiled_path(self, compiled_id):
+        return os.path.join(self.model_dir, f'compiled-{compiled_id}.npz')
+
+    def load_compiled(self, training_path=TRAINING_FILE, params=MODEL_PARAMS):
+        """Load the compiled forest for the given data and params with NumPy only, or return None"""
+        path = self.compiled_path(self.compiled_id(training_path, params))
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                return {
+                    'key': str(arrays['key']),
+                    'classes': arrays['classes'].astype(object),
+                    'symptoms': arrays['symptoms'].tolist(),
+                    'forest': CompiledForest.from_arrays(arrays),
+                    'model': None
+                }
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error loading compiled model {path}: {str(e)}")
+            return None
+
+    def save_compiled(self, compiled_id, artifact, forest):
+        """Atomically write the compiled forest of an artifact"""
+        os.makedirs(self.model_dir, exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, key=np.array(artifact['key']),
+                         classes=np.asarray(artifact['classes'], dtype=str),
+                         symptoms=np.asarray(artifact['symptoms'], dtype=str),
+                         **forest.to_arrays())
+        write_atomic(self.compiled_path(compiled_id), write)
+
+    def load(self, key):
+        """Load a stored artifact, or return None if it is missing or unreadable"""
+        path = self.artifact_path(key)
+        if not os.path.exists(path):
+            return None
+        import joblib
+        try:
+            artifact = joblib.load(path)
+        except Exception as e:
+            print(f"Error loading model artifact {path}: {str(e)}")
+            return None
+        return artifact if artifact.get('key') == key else None
+
+    def save(self, key, artifact):
+        """Atomically write an artifact so concurrent workers never see a partial file"""
+        import joblib
+        os.makedirs(self.model_dir, exist_ok=True)
+        artifact = dict(artifact, key=key)
+        write_atomic(self.artifact_path(key), lambda tmp_path: joblib.dump(artifact, tmp_path))
+        return artifact
+
+    def load_or_train(self, training_path=TRAINING_FILE, params=MODEL_PARAMS,
+                      df_training=None, force=False):
+        """Return the artifact for the given data and params, training only on a miss.
+
+        The returned artifact also carries its CompiledForest as 'forest', and
+        the compiled file is written if it is missing.
+        """
+        key = self.artifact_key(training_path, params)
+        artifact = None if force else self.load(key)
+        if artifact is None:
+            if df_training is None:
+                df_training = load_dataset(training_path).frame()
+            artifact = build_artifact(df_training, params)
+            try:
+                artifact = self.save(key, artifact)
+            except OSError as e:
+                print(f"Error saving model artifact: {str(e)}")
+                artifact = dict(artifact, key=key)
+
+        forest = CompiledForest(artifact['model'])
+        compiled = self.load_compiled(training_path, params)
+        if compiled is None or compiled['key'] != artifact['key']:
+            try:
+                self.save_compiled(self.compiled_id(training_path, params), artifact, forest)
+            except OSError as e:
+                print(f"Error saving compiled model: {str(e)}")
+        return dict(artifact, forest=forest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prebuild the chatbot model artifact')
+    parser.add_argument('--training', default=TRAINING_FILE, help='training CSV path')
+    parser.add_argument('--model-dir', default=MODEL_DIR, help='artifact directory')
+    parser.add_argument('--force', action='store_true', help='retrain even if an artifact exists')
+    args = parser.parse_args()
+
+    store = ModelStore(args.model_dir)
+    start = time.perf_counter()
+    artifact = store.load_or_train(args.training, MODEL_PARAMS, force=args.force)
+    elapsed = time.perf_counter() - start
+    print(f"Model artifact {store.artifact_path(artifact['key'])} ready in {elapsed:.2f}s")
+    print(f"Compiled model {store.compiled_path(store.compiled_id(args.training, MODEL_PARAMS))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Index of the distinct symptom profiles in the training data.
+
+Training.csv holds only a few hundred distinct profiles, and many user
+inputs are exactly one of them. ProfileIndex maps each profile's symptom
+bitmask to its row, so an exact match can reuse that profile's
+precomputed model distribution instead of running the model. A subset
+index keeps, per symptom, a bitset of the profiles containing it. ANDing
+those bitsets gives every known profile the input could be part of.
+Subset matches are only counted, and only when metrics are enabled
+(profile_index subset/miss in the metrics registry); such inputs still
+go through the model. The always-on stats() split lookups into exact
+matches and misses, so a miss costs one dict lookup.
+
+Masks are Python ints with bit i set for symptom column i, the same masks
+ChatbotCore.symptom_mask builds.
+"""
+import threading
+
+import metrics
+
+
+class ProfileIndex:
+    def __init__(self, X):
+        """Index the unique 0/1 rows of X"""
+        self.n_features = X.shape[1]
+        self.masks = []
+        self.row_by_mask = {}
+        self.profiles_with = [0] * self.n_features
+        for row, values in enumerate(X):
+            mask = 0
+            for feature in values.nonzero()[0].tolist():
+                mask |= 1 << feature
+                self.profiles_with[feature] |= 1 << row
+            self.masks.append(mask)
+            self.row_by_mask.setdefault(mask, row)
+        self.all_profiles = (1 << len(self.masks)) - 1
+
+        self._lock = threading.Lock()
+        self.exact = 0
+        self.misses = 0
+
+    def supersets(self, mask):
+        """Bitset of the profiles that contain every symptom in mask"""
+        profiles = self.all_profiles
+        while mask and profiles:
+            low = mask & -mask
+            profiles &= self.profiles_with[low.bit_length() - 1]
+            mask ^= low
+        return profiles
+
+    def lookup(self, mask):
+        """Row of the profile equal to mask, or None; counts exact and missed lookups"""
+        row = self.row_by_mask.get(mask)
+        with self._lock:
+            if row is not None:
+                self.exact += 1
+            else:
+                self.misses += 1
+        if metrics.registry.enabled:
+            # The subset check is a chain of big-int ANDs, so only pay for it when asked
+            result = 'exact' if row is not None else 'subset' if self.supersets(mask) else 'miss'
+            metrics.registry.count('profile_index', result)
+        return row
+
+    def stats(self):
+        lookups = self.exact + self.misses
+        return {
+            'profiles': len(self.masks),
+            'exact': self.exact,
+            'misses': self.misses,
+            'exact_rate': self.exact / lookups if lookups else 0.0
+        }
@@ -0,0 +1,477 @@
+"""Headless HTTP service for the medical chatbot.
+
+Runs on asyncio with only the standard library. One warm ChatbotCore is
+loaded at startup and shared by a MedicalChatbot view per language. Model
+work runs on a bounded thread pool. When more than --max-pending requests
+are queued, new ones get 503 right away so latency stays predictable under
+load instead of growing with the queue.
+
+With --processes N the parent loads the core once, binds the listening
+socket, freezes the garbage collector's view of every object built so far
+and forks N workers that accept on the shared socket. The forest, profile
+and training arrays are NumPy buffers with no per-element objects, and
+frozen objects are never written by the collector, so the workers share
+those pages copy-on-write instead of each holding a copy. The parent only
+restarts workers that die. /health reports the answering worker's memory;
+uss_kib is what that worker alone holds. With 3 workers after 2000 mixed
+requests each worker showed about 41 MiB RSS but only about 6 MiB USS,
+so the model and tables are held once for the whole pool.
+
+/chat keeps a conversation in a bounded session store (session_store.py):
+each turn's symptoms are merged into the session, and the whole set is
+predicted. Sessions idle longer than --session-ttl seconds are dropped,
+as is the least recently used one past --max-sessions. The store lives
+in each process, so with --processes a client's turns must reach the
+same worker (for example through a sticky proxy) or it starts a fresh
+session.
+
+Run from Real-Time-Medical-Assitant/:
+
+    python Data/server.py --port 8000
+    python Data/server.py --port 8000 --backend jaccard
+    python Data/server.py --port 8000 --processes 4
+
+    curl localhost:8000/health
+    curl -d '{"text": "I have a headache and nausea"}' localhost:8000/extract
+    curl -d '{"symptoms": ["headache", "nausea"], "language": "hi"}' localhost:8000/predict
+    curl -d '{"text": "I have a headache"}' localhost:8000/chat
+    curl -d '{"session_id": "...", "text": "and nausea"}' localhost:8000/chat
+    curl 'localhost:8000/disease?name=Migraine&language=en'
+    curl localhost:8000/metrics            # with --metrics
+
+Endpoints:
+    GET  /health   -> {"status": "ok", "languages": [...], "prediction_cache": {...}, "sessions": {...},
+                       "memory": {...}}
+    POST /extract  {"text", "language"} -> {"symptoms": [...]}
+    POST /predict  {"symptoms" or "text", "language", "top_k"} -> {"symptoms", "predictions", "triage"}
+    POST /chat     {"session_id", "symptoms" or "text", "language", "top_k", "reset"}
+                   -> {"session_id", "turns", "symptoms", "new_symptoms", "predictions", "triage"}
+    GET  /disease  ?name=&language= -> {"name", "description", "precautions"}
+    GET  /metrics  ?format=json -> per-stage latency histograms (Prometheus text by default)
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from backends import BACKENDS
+from model import ChatbotCore, MedicalChatbot, prediction_cache
+from session_store import MAX_SESSIONS, SESSION_TTL, SessionStore
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+READ_TIMEOUT = 30.0
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    408: 'Request Timeout',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+
+def memory_usage():
+    """Resident, proportional and unique set size of this process in KiB, or None off Linux"""
+    sizes = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    sizes[name] = int(value.split()[0])
+    except (OSError, ValueError):
+        return None
+    return {
+        'pid': os.getpid(),
+        'rss_kib': sizes['Rss'],
+        'pss_kib': sizes['Pss'],
+        'uss_kib': sizes['Private_Clean'] + sizes['Private_Dirty']
+    }
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ChatbotService:
+    """Request handlers over one warm chatbot view per language"""
+
+    def __init__(self, core=None, workers=None, max_pending=1024, backend='forest',
+                 session_ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.core = core or ChatbotCore.shared()
+        self.chatbots = {
+            language: MedicalChatbot(language=language, core=self.core, backend=backend)
+            for language in ('en', 'hi', 'te')
+        }
+        # Build the shared phrase automaton, typo index, profile index and triage tables before
+        # the first request, so forked workers share them
+        self.chatbots['en'].symptom_matcher
+        self.chatbots['en'].fuzzy_matcher
+        self.core.profile_distributions(backend)
+        self.core.triage
+
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1),
+                                           thread_name_prefix='chatbot')
+        self.max_pending = max_pending
+        self.pending = 0
+        self.sessions = SessionStore(ttl=session_ttl, max_sessions=max_sessions)
+
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('POST', '/extract'): self.extract,
+            ('POST', '/predict'): self.predict,
+            ('POST', '/chat'): self.chat,
+            ('GET', '/disease'): self.disease,
+            ('GET', '/metrics'): self.metrics
+        }
+
+    def chatbot_for(self, language):
+        if language is not None and not isinstance(language, str):
+            raise HTTPError(400, "'language' must be a string")
+        chatbot = self.chatbots.get(language or 'en')
+        if chatbot is None:
+            raise HTTPError(400, f"Unsupported language: {language}")
+        return chatbot
+
+    async def run_in_executor(self, func, *args):
+        """Run model work on the pool, shedding load once the queue is full"""
+        if self.pending >= self.max_pending:
+            raise HTTPError(503, 'Server busy, try again later')
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def health(self, query, body):
+        return {
+            'status': 'ok',
+            'languages': list(self.chatbots),
+            'model': self.core.model_key,
+            'backend': self.chatbots['en'].backend,
+            'prediction_cache': prediction_cache.stats(),
+            'profile_index': self.core.profile_index.stats(),
+            'sessions': self.sessions.stats(),
+            'memory': memory_usage()
+        }
+
+    async def extract(self, query, body):
+        text = body.get('text')
+        if not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a string")
+        chatbot = self.chatbot_for(body.get('language'))
+        symptoms = await self.run_in_executor(chatbot.extract_symptoms_from_text, text)
+        return {'symptoms': symptoms}
+
+    async def predict(self, query, body):
+        chatbot = self.chatbot_for(body.get('language'))
+        top_k = body.get('top_k', 3)
+        if not isinstance(top_k, int) or top_k < 1:
+            raise HTTPError(400, "'top_k' must be a positive integer")
+
+        symptoms = body.get('symptoms')
+        text = body.get('text')
+        if symptoms is None and isinstance(text, str):
+            symptoms = await self.run_in_executor(chatbot.extract_symptoms_from_text, text)
+        if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+            raise HTTPError(400, "'symptoms' must be a list of strings, or send 'text'")
+
+        # Predictions and triage from one engine call, in one trip to the pool
+        predictions, triage = await self.run_in_executor(chatbot.predict_with_triage, symptoms, top_k)
+        return {
+            'symptoms': symptoms,
+            'predictions': [
+                {'condition': condition, 'confidence': round(float(confidence), 2)}
+                for condition, confidence in predictions
+            ],
+            'triage': triage
+        }
+
+    async def chat(self, query, body):
+        top_k = body.get('top_k', 3)
+        if not isinstance(top_k, int) or top_k < 1:
+            raise HTTPError(400, "'top_k' must be a positive integer")
+        language = body.get('language')
+        self.chatbot_for(language)
+        symptoms = body.get('symptoms')
+        text = body.get('text')
+        if symptoms is not None and (not isinstance(symptoms, list)
+                                     or not all(isinstance(s, str) for s in symptoms)):
+            raise HTTPError(400, "'symptoms' must be a list of strings")
+        if text is not None and not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a string")
+
+        # An unknown or expired id starts a new conversation; the reply carries its id
+        session_id = body.get('session_id')
+        session = self.sessions.get(session_id) if isinstance(session_id, str) else None
+        if session is None:
+            session = self.sessions.create(language or 'en')
+        elif language:
+            session.language = language
+        if body.get('reset'):
+            session.reset()
+        chatbot = self.chatbot_for(session.language)
+
+        if symptoms is None:
+            symptoms = await self.run_in_executor(chatbot.extract_symptoms_from_text, text) if text else []
+
+        new = session.add_symptoms(self.core.symptom_mask(symptoms))
+        session.turns += 1
+
+        # Only a changed symptom set, language or top_k needs the model again
+        key = (session.mask, session.language, top_k)
+        if session.last_prediction is not None and session.last_prediction[0] == key:
+            predictions, triage = session.last_prediction[1]
+        elif session.mask:
+            all_symptoms = self.core.mask_symptoms(session.mask)
+            predictions, triage = await self.run_in_executor(chatbot.predict_with_triage, all_symptoms, top_k)
+            predictions = tuple(predictions)
+            session.last_prediction = (key, (predictions, triage))
+        else:
+            predictions, triage = (), None
+
+        return {
+            'session_id': session.session_id,
+            'turns': session.turns,
+            'symptoms': self.core.mask_symptoms(session.mask),
+            'new_symptoms': self.core.mask_symptoms(new),
+            'predictions': [
+                {'condition': condition, 'confidence': round(float(confidence), 2)}
+                for condition, confidence in predictions
+            ],
+            'triage': triage
+        }
+
+    async def disease(self, query, body):
+        name = query.get('name', [None])[0]
+        if not name:
+            raise HTTPError(400, "Missing 'name' query parameter")
+        chatbot = self.chatbot_for(query.get('language', ['en'])[0])
+        return {
+            'name': name,
+            'description': chatbot.get_description(name),
+            'precautions': chatbot.get_precautions(name)
+        }
+
+    async def metrics(self, query, body):
+        if query.get('format', [''])[0] == 'json':
+            return metrics.registry.snapshot()
+        return metrics.registry.prometheus_text()
+
+    async def dispatch(self, method, target, body_bytes):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                raise HTTPError(405, f"{method} not allowed on {url.path}")
+            raise HTTPError(404, f"No route for {url.path}")
+
+        body = {}
+        if body_bytes:
+            try:
+                body = json.loads(body_bytes)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise HTTPError(400, 'Request body must be JSON')
+            if not isinstance(body, dict):
+                raise HTTPError(400, 'Request body must be a JSON object')
+        return await handler(parse_qs(url.query), body)
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), READ_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 413, {'error': 'Headers too large'}, keep_alive=False)
+                    break
+
+                keep_alive = True
+                try:
+                    lines = head.decode('latin-1').split('\r\n')
+                    method, target, version = lines[0].split(' ', 2)
+                    headers = {}
+                    for line in lines[1:]:
+                        if ':' in line:
+                            name, value = line.split(':', 1)
+                            headers[name.strip().lower()] = value.strip()
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, 'Request body too large')
+                    body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT) if length else b''
+
+                    status, payload = 200, await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': e.message}
+                except ValueError:
+                    status, payload, keep_alive = 400, {'error': 'Malformed request'}, False
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    status, payload, keep_alive = 408, {'error': 'Request timed out'}, False
+                except Exception:
+                    # A bug in a handler must not drop the connection without a response
+                    request_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+                    print(f"Error handling {request_line}:")
+                    traceback.print_exc()
+                    status, payload, keep_alive = 500, {'error': 'Internal server error'}, False
+
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, payload, keep_alive=True):
+        """Write a response; dict payloads are sent as JSON, strings as plain text"""
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000, sock=None):
+        """Serve forever on host:port, or on an already-bound listening socket"""
+        if sock is not None:
+            server = await asyncio.start_server(self.handle_connection, sock=sock,
+                                                limit=MAX_HEADER_BYTES)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port,
+                                                limit=MAX_HEADER_BYTES, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def listen_socket(host, port, backlog=1024):
+    """Bind the listening socket in the parent so every forked worker accepts on it"""
+    sock = socket.create_server((host, port), backlog=backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(service, sock):
+    """Body of one forked worker; never returns"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    gc.enable()
+    status = 0
+    try:
+        asyncio.run(service.serve(sock=sock))
+    except KeyboardInterrupt:
+        pass
+    except BaseException as e:
+        print(f"Worker {os.getpid()} failed: {str(e)}")
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def serve_prefork(service, sock, processes):
+    """Fork worker processes that share the warm service copy-on-write, restarting any that die"""
+    # Everything built so far is read-only from here on. Frozen objects are skipped by the
+    # collector, so its bookkeeping writes never copy their pages into the workers.
+    gc.collect()
+    gc.disable()
+    gc.freeze()
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            run_worker(service, sock)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for _ in range(processes):
+        spawn()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            spawn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the chatbot HTTP service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help='model worker threads per process')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='forked worker processes sharing one loaded model (POSIX only)')
+    parser.add_argument('--max-pending', type=int, default=1024,
+                        help='queued model calls before answering 503')
+    parser.add_argument('--metrics', action='store_true', help='record per-stage latency for /metrics')
+    parser.add_argument('--backend', default='forest', choices=BACKENDS, help='inference engine')
+    parser.add_argument('--session-ttl', type=float, default=SESSION_TTL,
+                        help='seconds an idle /chat session is kept')
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS,
+                        help='/chat sessions kept per process before the least recently used is dropped')
+    args = parser.parse_args()
+    if args.processes > 1 and not hasattr(os, 'fork'):
+        parser.error('--processes needs a platform with fork()')
+    if args.metrics:
+        metrics.enable()
+
+    start = time.perf_counter()
+    service = ChatbotService(workers=args.workers, max_pending=args.max_pending,
+                             backend=args.backend, session_ttl=args.session_ttl,
+                             max_sessions=args.max_sessions)
+    print(f"Model {service.core.model_key} warm in {time.perf_counter() - start:.2f}s, "
+          f"serving on http://{args.host}:{args.port}")
+    if args.processes > 1:
+        print(f"Forking {args.processes} worker processes")
+        serve_prefork(service, listen_socket(args.host, args.port), args.processes)
+        return
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
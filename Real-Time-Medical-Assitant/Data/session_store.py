@@ -0,0 +1,146 @@
+"""Bounded store of chatbot conversations for the HTTP service.
+
+Each conversation is a slotted Session. Its symptoms are a bitmask over
+the model's symptom columns (ChatbotCore.symptom_mask), so a repeated
+symptom sets the same bit again instead of growing a list. The whole
+set costs one 132-bit int. The session also holds its language code,
+turn count and the last prediction, which is reused while the mask,
+language and top_k are unchanged.
+
+Sessions live in an OrderedDict in least recently used order, like
+resource_cache.LRUCache. That is also idle order, so expiry only looks
+at the front: every access first drops sessions idle longer than the
+TTL, and creating a session past max_sessions drops the least recently
+used one.
+
+stats() reports bytes_per_session, estimated from a sample of sessions.
+In a test with 10000 sessions of four symptoms and a cached top-3
+prediction and triage, it came to about 1.1 KiB each. About 400 bytes
+of that is the session itself and its index entry.
+"""
+import itertools
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = 30 * 60
+MAX_SESSIONS = 10000
+
+# Sessions sampled when estimating memory per session
+SIZE_SAMPLE = 1000
+
+
+class Session:
+    __slots__ = ('session_id', 'mask', 'language', 'turns', 'last_used', 'last_prediction')
+
+    def __init__(self, session_id, language='en', now=0.0):
+        self.session_id = session_id
+        self.mask = 0
+        self.language = language
+        self.turns = 0
+        self.last_used = now
+        # (key, result) of the last prediction; key is (mask, language, top_k)
+        self.last_prediction = None
+
+    def add_symptoms(self, mask):
+        """Merge a symptom bitmask into the session; returns the bits that were new"""
+        new = mask & ~self.mask
+        self.mask |= mask
+        return new
+
+    def reset(self):
+        self.mask = 0
+        self.last_prediction = None
+
+
+def deep_size(value):
+    """Bytes held by a value and the tuples, lists and dicts inside it.
+
+    Strings are left out: condition names and dict keys are shared with
+    the chatbot's tables rather than copied per session.
+    """
+    if isinstance(value, str):
+        return 0
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(deep_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    return size
+
+
+def session_size(session):
+    """Bytes one session holds, not counting interned strings such as its language code"""
+    return (sys.getsizeof(session) + sys.getsizeof(session.session_id) + sys.getsizeof(session.mask)
+            + sys.getsizeof(session.last_used) + deep_size(session.last_prediction))
+
+
+class SessionStore:
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _expire(self, now):
+        """Drop sessions idle longer than the TTL; they are all at the front"""
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def create(self, language='en'):
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            session = Session(secrets.token_urlsafe(12), language, now)
+            self._sessions[session.session_id] = session
+            self.created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            return session
+
+    def get(self, session_id):
+        """The live session with this id, marked as used now, or None"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            self._expire(self.clock())
+            sample = list(itertools.islice(self._sessions.values(), SIZE_SAMPLE))
+            per_session = sum(map(session_size, sample)) / len(sample) if sample else 0.0
+            # The ordered index's share: hash table slot and linked-list node per entry
+            index = sys.getsizeof(self._sessions) / len(self._sessions) if self._sessions else 0.0
+            return {
+                'size': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'ttl_s': self.ttl,
+                'created': self.created,
+                'expired': self.expired,
+                'evicted': self.evicted,
+                'bytes_per_session': round(per_session + index, 1)
+            }
@@ -0,0 +1,132 @@
+"""Multi-pattern symptom phrase matching.
+
+One Aho-Corasick automaton is built over the symptom phrases of every
+language, so extracting symptoms is a single pass over the input text no
+matter how many phrases or languages there are. Each phrase remembers which
+symptom it maps to per language, and matches are filtered to the active
+language at query time.
+"""
+import bisect
+import unicodedata
+
+# Separates phrases in the reverse-lookup haystack; never appears in user text
+PHRASE_SEPARATOR = '\x00'
+
+
+def is_word_char(ch):
+    """Letters, combining marks (Devanagari/Telugu vowel signs) and digits.
+
+    Underscores are not word characters: the Telugu lexicon uses them in
+    place of spaces.
+    """
+    return unicodedata.category(ch)[0] in 'LMN'
+
+
+class SymptomMatcher:
+    def __init__(self, symptom_mappings):
+        """Build the automaton from {language: {phrase: symptom}}"""
+        self.phrases = []
+        self.symptoms_by_phrase = []
+        phrase_ids = {}
+
+        # Trie over every phrase of every language
+        self.goto = [{}]
+        self.output = [()]
+        for language, mapping in symptom_mappings.items():
+            for phrase, symptom in mapping.items():
+                if not phrase:
+                    continue
+                phrase_id = phrase_ids.get(phrase)
+                if phrase_id is None:
+                    phrase_id = phrase_ids[phrase] = len(self.phrases)
+                    self.phrases.append(phrase)
+                    self.symptoms_by_phrase.append({})
+                    self._insert(phrase, phrase_id)
+                self.symptoms_by_phrase[phrase_id][language] = symptom
+        self._build_failure_links()
+
+        # Per-language haystack of all phrases for "text inside phrase" lookups
+        self.haystacks = {}
+        for language, mapping in symptom_mappings.items():
+            phrases = [p for p in mapping if p and PHRASE_SEPARATOR not in p]
+            starts = []
+            offset = 0
+            for phrase in phrases:
+                starts.append(offset)
+                offset += len(phrase) + 1
+            self.haystacks[language] = (PHRASE_SEPARATOR.join(phrases), starts,
+                                        [mapping[p] for p in phrases])
+
+    def _insert(self, phrase, phrase_id):
+        state = 0
+        for ch in phrase:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.output.append(())
+            state = next_state
+        self.output[state] = self.output[state] + (phrase_id,)
+
+    def _build_failure_links(self):
+        """Breadth-first failure links; outputs inherit the failure state's outputs"""
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, phrase_id) for every phrase occurrence in text"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for phrase_id in output[state]:
+                yield end - len(self.phrases[phrase_id]), end, phrase_id
+
+    def find_symptoms(self, text, language, word_boundary=True):
+        """Return symptoms of the given language found in text, in order of appearance.
+
+        With word_boundary, a phrase must start at the beginning of a word, so
+        'fever' does not fire inside 'feverfew' but 'cough' still matches 'coughing'.
+        """
+        found = {}
+        for start, end, symptom in self.match_spans(text, language, word_boundary):
+            found.setdefault(symptom, start)
+        return sorted(found, key=found.get)
+
+    def match_spans(self, text, language, word_boundary=True):
+        """Yield (start, end, symptom) for every phrase of the language found in text"""
+        for start, end, phrase_id in self.iter_matches(text):
+            symptom = self.symptoms_by_phrase[phrase_id].get(language)
+            if symptom is None:
+                continue
+            if word_boundary and start > 0 and is_word_char(text[start - 1]) \
+                    and is_word_char(text[start]):
+                continue
+            yield start, end, symptom
+
+    def find_phrases_containing(self, text, language):
+        """Return symptoms whose phrase contains text, scanning all phrases in one C-level search"""
+        haystack, starts, symptoms = self.haystacks[language]
+        if not text or PHRASE_SEPARATOR in text:
+            return []
+        matches = []
+        position = haystack.find(text)
+        while position != -1:
+            index = bisect.bisect_right(starts, position) - 1
+            matches.append(symptoms[index])
+            # Resume at the next phrase, one hit per phrase is enough
+            next_start = starts[index + 1] if index + 1 < len(starts) else len(haystack)
+            position = haystack.find(text, next_start)
+        return matches
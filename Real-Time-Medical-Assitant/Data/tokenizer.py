@@ -0,0 +1,87 @@
+"""Normalization and word segmentation for symptom text.
+
+User input and lexicon phrases go through the same steps, so a phrase
+matches however the user's keyboard encoded it:
+
+- lowercase, then Unicode NFC, so precomposed and decomposed forms of the
+  same letter compare equal
+- split into words by script. Devanagari and Telugu words keep their vowel
+  signs, viramas and zero-width joiners, which are Unicode marks rather
+  than letters. Punctuation, danda, hyphens and underscores separate words,
+  so the Telugu lexicon's 'కడుపులో_రక్తస్రావం' and typed 'కడుపులో రక్తస్రావం'
+  become the same words
+- drop the language's stop words
+
+tokenize returns a TokenStream. Its text is the kept words joined by
+single spaces, which is what the phrase matchers scan. starts maps every
+word to its offset in that text, so a match maps back to words without
+slicing strings again.
+"""
+import bisect
+import re
+import unicodedata
+
+# Bump when the steps change so compiled lexicon packs are rebuilt
+TOKENIZER_VERSION = 1
+
+STOP_WORDS = {
+    'en': frozenset({'i', 'am', 'have', 'having', 'with', 'and', 'also', 'feeling'}),
+    'hi': frozenset({'मुझे', 'है', 'हैं', 'और', 'भी', 'महसूस', 'कर', 'रहा', 'रही'}),
+    'te': frozenset({'నాకు', 'ఉంది', 'మరియు', 'కూడా', 'అనిపిస్తోంది'})
+}
+NO_STOP_WORDS = frozenset()
+
+# One alternative per script; the last takes letters and digits of any other script.
+# Danda (U+0964, U+0965) is punctuation inside the Devanagari block.
+WORD = re.compile(
+    r'[\u0900-\u0963\u0966-\u097F\u200C\u200D]+'
+    r'|[\u0C00-\u0C7F\u200C\u200D]+'
+    r'|[^\W_\u0900-\u097F\u0C00-\u0C7F]+'
+)
+
+
+class TokenStream:
+    """Words of one text after normalization and stop-word removal"""
+    __slots__ = ('text', 'words', 'starts')
+
+    def __init__(self, words):
+        self.words = words
+        self.text = ' '.join(words)
+        self.starts = []
+        offset = 0
+        for word in words:
+            self.starts.append(offset)
+            offset += len(word) + 1
+
+    def __len__(self):
+        return len(self.words)
+
+    def word_range(self, start, end):
+        """Indexes of the words overlapping text[start:end]"""
+        return range(bisect.bisect_right(self.starts, start) - 1,
+                     bisect.bisect_left(self.starts, end))
+
+
+def normalize(text):
+    return unicodedata.normalize('NFC', text.lower())
+
+
+def tokenize(text, language):
+    """Split text into a TokenStream for the given language"""
+    stop_words = STOP_WORDS.get(language, NO_STOP_WORDS)
+    return TokenStream([word for word in WORD.findall(normalize(text)) if word not in stop_words])
+
+
+def normalize_phrase(phrase, language):
+    """Canonical form of a lexicon phrase, as tokenize would produce it from typed text"""
+    return tokenize(phrase, language).text
+
+
+def normalize_phrases(mapping, language):
+    """Rekey a {phrase: symptom} table by canonical phrase; phrases of only stop words are dropped"""
+    normalized = {}
+    for phrase, symptom in mapping.items():
+        key = normalize_phrase(phrase, language)
+        if key:
+            normalized[key] = symptom
+    return normalized
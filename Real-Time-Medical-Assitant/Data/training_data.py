@@ -0,0 +1,263 @@
+"""Training data preparation for the symptom forest.
+
+Training.csv repeats each (symptom profile, prognosis) pair many times:
+its 4,920 rows hold only 304 distinct profiles. prepare_training_set
+collapses the duplicates into unique uint8 rows with a sample weight that
+counts how often each one occurred. The cache, the profile index and
+the lightweight backends all work on those 304 rows.
+
+Passing the counts straight to a bootstrapped forest is not the same fit.
+sklearn would draw each tree's bootstrap uniformly from the unique rows,
+so a tree would miss about 37% of the profiles, where a raw-row
+bootstrap misses almost none. fit_forest instead draws each tree's
+weights from multinomial(n_source_rows, counts / total). That is the
+same distribution as the per-profile totals of a raw-row bootstrap. Each
+tree is then grown directly on the unique uint8 rows with its weights,
+as a DecisionTreeClassifier with the forest's tree parameters and the
+seed the forest would have given it. The result matches a forest that
+grows the same trees itself, at about 0.2 s against 0.55 s for a fit on
+the raw rows.
+
+Check that the weighted fit predicts like a fit on the raw rows, in both
+labels and confidence, and that the compiled forest (forest_engine)
+reproduces its probabilities bit for bit (run from
+Real-Time-Medical-Assitant/):
+
+    python Data/training_data.py --check
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from dataset import load_dataset
+from forest_engine import SPARSE_BATCH_LIMIT, CompiledForest
+
+TESTING_FILE = 'Data/Testing.csv'
+
+# Part of the model artifact key, so artifacts fit on differently prepared data never mix
+PREPARATION = 'dedup-weighted-2'
+
+# Largest allowed gap in mean top-1 confidence between the weighted and the raw fit
+CONFIDENCE_TOLERANCE = 0.02
+
+
+class TrainingSet:
+    """Unique training rows with per-row sample weights"""
+
+    def __init__(self, X, y, sample_weight, symptoms, classes, n_source_rows):
+        self.X = X                          # (n_unique, n_symptoms) uint8
+        self.y = y                          # (n_unique,) class codes
+        self.sample_weight = sample_weight  # (n_unique,) occurrence counts
+        self.symptoms = symptoms
+        self.classes = classes
+        self.n_source_rows = n_source_rows
+
+    @property
+    def duplication_ratio(self):
+        return self.n_source_rows / max(1, len(self.y))
+
+    def frame(self):
+        """Symptom matrix as a DataFrame, so fitted models keep the column names"""
+        import pandas as pd
+        return pd.DataFrame(self.X, columns=self.symptoms)
+
+
+def encode_labels(labels, classes):
+    """Class codes of labels in the sorted classes array, like LabelEncoder.transform"""
+    labels = np.asarray(labels)
+    codes = np.searchsorted(classes, labels)
+    codes[codes == len(classes)] = 0
+    unknown = classes[codes] != labels
+    if unknown.any():
+        raise ValueError(f"Labels not among the model classes: {sorted(set(labels[unknown].tolist()))}")
+    return codes
+
+
+def prepare_training_set(data, classes=None):
+    """Collapse identical (symptom vector, prognosis) rows into weighted unique rows.
+
+    data is a training DataFrame or a dataset.Dataset. Labels are coded
+    against classes, by default the sorted unique labels.
+    """
+    if hasattr(data, 'frame'):
+        symptoms = list(data.symptoms)
+        values, labels = np.asarray(data.X), data.labels.astype(object)
+    else:
+        symptoms = list(data.columns[:-1])
+        values, labels = data[symptoms].to_numpy(), data['prognosis'].to_numpy()
+    if values.size and (values.min() < 0 or values.max() > 1):
+        raise ValueError('Symptom columns must be binary')
+    X = values.astype(np.uint8)
+
+    if classes is None:
+        classes = np.unique(labels)
+    y = encode_labels(labels, classes)
+
+    # Unique (row, label) pairs, kept in order of first appearance
+    dtype = np.promote_types(np.uint8, np.min_scalar_type(len(classes)))
+    combined = np.column_stack([X.astype(dtype, copy=False), y.astype(dtype)])
+    _, first, counts = np.unique(combined, axis=0, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    keep = first[order]
+
+    return TrainingSet(np.ascontiguousarray(X[keep]), y[keep],
+                       counts[order].astype(np.float64), symptoms,
+                       classes, len(labels))
+
+
+def bootstrap_weights(training_set, n_estimators, random_state):
+    """Per-tree weights of the unique rows, distributed like a bootstrap of the raw rows"""
+    rng = np.random.default_rng(random_state)
+    weights = training_set.sample_weight
+    return rng.multinomial(training_set.n_source_rows, weights / weights.sum(),
+                           size=n_estimators).astype(np.float64)
+
+
+def fit_forest(training_set, params):
+    """Fit a RandomForestClassifier on the weighted unique rows, equivalent to a fit on the raw rows"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.utils import check_random_state
+    model = RandomForestClassifier(**params)
+    if not model.bootstrap:
+        return model.fit(training_set.frame(), training_set.y, sample_weight=training_set.sample_weight)
+
+    # Tree seeds in the order a single forest fit draws them from random_state
+    n_trees = model.n_estimators
+    tree_weights = bootstrap_weights(training_set, n_trees, model.random_state)
+    random_state = check_random_state(model.random_state)
+    seeds = [random_state.randint(np.iinfo(np.int32).max) for _ in range(n_trees)]
+
+    # A one-tree fit sets up the forest's fitted attributes; the other trees are grown directly
+    model.set_params(n_estimators=1, bootstrap=False)
+    model.fit(training_set.frame(), training_set.y, sample_weight=tree_weights[0])
+    tree_params = {name: getattr(model, name) for name in model.estimator_params if name != 'random_state'}
+    for seed, weights in zip(seeds[1:], tree_weights[1:]):
+        tree = DecisionTreeClassifier(**tree_params, random_state=seed)
+        model.estimators_.append(tree.fit(training_set.X, training_set.y, sample_weight=weights))
+    model.set_params(n_estimators=n_trees, bootstrap=True)
+    return model
+
+
+def top1_agreement(model_a, model_b, X):
+    """Fraction of rows where two models predict the same class"""
+    return float(np.mean(model_a.predict(X) == model_b.predict(X)))
+
+
+def confidence_summary(model, X, threshold=0.5):
+    """Mean top-1 probability and the share of rows below threshold"""
+    confidence = model.predict_proba(X).max(axis=1)
+    return float(confidence.mean()), float(np.mean(confidence < threshold))
+
+
+def engine_mismatches(model, X, rng):
+    """Inputs on which the compiled forest's probabilities differ from the model's; empty if none.
+
+    X is a 0/1 matrix. Batches take the chain walk, single rows and small
+    batches the per-row sparse walk, and non-binary values the dense walk.
+    """
+    import pandas as pd
+    compiled = CompiledForest(model)
+    X = np.asarray(X)
+    non_binary = rng.random(X.shape) * 1.5
+    cases = {
+        'batch': (X, compiled.predict_proba(X)),
+        'small batch': (X[:SPARSE_BATCH_LIMIT], compiled.predict_proba(X[:SPARSE_BATCH_LIMIT])),
+        'single rows': (X[:100], np.vstack([compiled.predict_proba(row[None]) for row in X[:100]])),
+        'non-binary batch': (non_binary, compiled.predict_proba(non_binary)),
+        'non-binary small batch': (non_binary[:4], compiled.predict_proba(non_binary[:4]))
+    }
+    return [name for name, (inputs, proba) in cases.items()
+            if not np.array_equal(proba, model.predict_proba(pd.DataFrame(inputs, columns=model.feature_names_in_)))]
+
+
+def main():
+    # model_store builds artifacts with this module, so import it late
+    from model_store import MODEL_PARAMS, TRAINING_FILE
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    parser = argparse.ArgumentParser(description='Inspect the deduplicated training set')
+    parser.add_argument('--training', default=TRAINING_FILE)
+    parser.add_argument('--testing', default=TESTING_FILE)
+    parser.add_argument('--check', action='store_true',
+                        help='fit on raw and on weighted rows and compare predictions')
+    parser.add_argument('--samples', type=int, default=2000,
+                        help='random partial symptom sets to compare')
+    args = parser.parse_args()
+
+    df_training = load_dataset(args.training).frame()
+    training_set = prepare_training_set(df_training)
+    print(f"{training_set.n_source_rows} rows -> {len(training_set.y)} unique "
+          f"({training_set.duplication_ratio:.1f}x duplication), "
+          f"{training_set.X.nbytes / 1024:.1f} KiB as uint8")
+    if not args.check:
+        return
+
+    X_raw = df_training.drop('prognosis', axis=1)
+    y_raw = LabelEncoder().fit(df_training['prognosis']).transform(df_training['prognosis'])
+
+    start = time.perf_counter()
+    raw_model = RandomForestClassifier(**MODEL_PARAMS).fit(X_raw, y_raw)
+    raw_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    weighted_model = fit_forest(training_set, MODEL_PARAMS)
+    weighted_seconds = time.perf_counter() - start
+    print(f"fit: raw {raw_seconds:.2f}s, weighted {weighted_seconds:.2f}s")
+
+    df_testing = load_dataset(args.testing).frame()
+    X_test = df_testing[training_set.symptoms].astype(np.uint8)
+    y_test = df_testing['prognosis'].str.strip()
+    classes = training_set.classes
+    for name, model in (('raw', raw_model), ('weighted', weighted_model)):
+        accuracy = np.mean(pd.Series(classes[model.predict(X_test)]).str.strip() == y_test)
+        print(f"{name} test accuracy: {accuracy:.4f}")
+
+    # Partial profiles are what the chatbot actually sees: drop symptoms at random
+    rng = np.random.default_rng(42)
+    rows = training_set.X[rng.integers(len(training_set.y), size=args.samples)]
+    partial = rows & (rng.random(rows.shape) < 0.5)
+    X_partial = pd.DataFrame(partial, columns=training_set.symptoms)
+
+    # Two raw fits that differ only in seed show how much disagreement is just noise
+    reseeded = RandomForestClassifier(**dict(MODEL_PARAMS, random_state=MODEL_PARAMS['random_state'] + 1))
+    reseeded.fit(X_raw, y_raw)
+
+    profile_agreement = top1_agreement(raw_model, weighted_model, training_set.frame())
+    partial_agreement = top1_agreement(raw_model, weighted_model, X_partial)
+    seed_agreement = top1_agreement(raw_model, reseeded, X_partial)
+    print(f"top-1 agreement: full profiles {profile_agreement:.4f}, "
+          f"partial profiles {partial_agreement:.4f} (raw vs reseeded raw {seed_agreement:.4f})")
+
+    # Matching labels is not enough: the GUIs act on the confidence of the top answer
+    summaries = {name: confidence_summary(model, X_partial)
+                 for name, model in (('raw', raw_model), ('weighted', weighted_model),
+                                     ('reseeded raw', reseeded))}
+    for name, (mean, low) in summaries.items():
+        print(f"{name} partial profiles: mean top-1 confidence {mean:.4f}, below 50% {low:.4f}")
+    confidence_gap = abs(summaries['weighted'][0] - summaries['raw'][0])
+
+    # The chatbot serves the compiled forest, which promises sklearn's probabilities exactly
+    mismatches = engine_mismatches(weighted_model, partial, rng)
+    print(f"compiled forest vs sklearn: {'identical' if not mismatches else 'differs on ' + ', '.join(mismatches)}")
+
+    failed = False
+    if profile_agreement < 1.0:
+        print('Weighted model disagrees with the raw model on full training profiles')
+        failed = True
+    if confidence_gap > CONFIDENCE_TOLERANCE:
+        print(f"Weighted model's mean top-1 confidence is {confidence_gap:.4f} away from the raw "
+              f"model's (tolerance {CONFIDENCE_TOLERANCE})")
+        failed = True
+    if mismatches:
+        print('Compiled forest probabilities differ from scikit-learn')
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Severity-weighted triage for a set of reported symptoms.
+
+Symptom_severity.csv rates every symptom from 1 to 7. The weights are
+loaded once into an integer array that lines up with the model's symptom
+columns, so the severity of an input is a dot product with its 0/1 row,
+or a gather over its active indices.
+
+A triage score in [0, 1] averages two parts, both on the weight scale:
+
+- reported: the summed weight of the reported symptoms divided by their
+  count plus one. This is the original Kaggle chatbot's rule, so a
+  single symptom counts for less than a consistent set of them.
+- expected: the severity of the likely conditions. Each condition's
+  severity is the mean weight of the symptoms in its Training.csv rows.
+  These are averaged over the top-k predictions, weighted by their
+  probabilities.
+
+The tier comes from fixed cut-offs on the score. Any red-flag symptom
+(weight 7, e.g. chest_pain or coma) raises it to at least 'high'.
+"""
+import re
+
+import numpy as np
+
+from dataset import read_table
+
+SEVERITY_FILE = 'Data/Symptom_severity.csv'
+MAX_WEIGHT = 7
+RED_FLAG_WEIGHT = 7
+
+# (tier, lowest score) from most to least urgent
+TIERS = (('high', 0.6), ('moderate', 0.45), ('low', 0.0))
+
+
+def severity_key(name):
+    """Lookup key for a symptom name: the severity table and the data disagree on spaces"""
+    return re.sub(r'[\s_]+', '_', name.strip()).lower()
+
+
+def load_severity_weights(symptoms, path=SEVERITY_FILE):
+    """int8 weight per symptom column; columns missing from the table get 0.
+
+    A name listed twice gives its weights in order to the column and its
+    pandas-style '.1' duplicate, as the CSVs were read.
+    """
+    listed = {}
+    for row in read_table(path):
+        if row['Symptom'] and row['weight']:
+            listed.setdefault(severity_key(row['Symptom']), []).append(int(row['weight']))
+
+    weights = np.zeros(len(symptoms), dtype=np.int8)
+    for i, symptom in enumerate(symptoms):
+        duplicate = re.fullmatch(r'(.*)\.(\d+)', symptom)
+        base, copy = (duplicate.group(1), int(duplicate.group(2))) if duplicate else (symptom, 0)
+        options = listed.get(severity_key(base), [])
+        if copy < len(options):
+            weights[i] = options[copy]
+    return weights
+
+
+def tier_for(score, red_flag=False):
+    for tier, lowest in TIERS:
+        if score >= lowest or (red_flag and tier == 'high'):
+            return tier
+    return TIERS[-1][0]
+
+
+class SeverityTriage:
+    def __init__(self, weights, X, y, sample_weight, n_classes):
+        """Severity per condition from weighted 0/1 rows X labelled with class codes y"""
+        self.weights = np.asarray(weights)
+        X = np.asarray(X, dtype=np.float64)
+        counts = np.maximum(X.sum(axis=1), 1)
+        row_severity = (X @ self.weights) / counts
+        totals = np.bincount(y, weights=sample_weight, minlength=n_classes)
+        self.class_severity = (np.bincount(y, weights=sample_weight * row_severity, minlength=n_classes)
+                               / np.maximum(totals, 1))
+
+    def assess(self, active, scores, top_k=3):
+        """Triage of the active symptom indices, given the engine's class scores for them"""
+        active = np.asarray(active, dtype=np.intp)
+        active_weights = self.weights[active]
+        reported = float(active_weights.sum()) / (len(active) + 1)
+
+        scores = np.asarray(scores, dtype=np.float64)
+        top = np.argpartition(scores, -top_k)[-top_k:] if top_k < len(scores) else np.arange(len(scores))
+        total = scores[top].sum()
+        expected = float(scores[top] @ self.class_severity[top] / total) if total > 0 else 0.0
+
+        score = (reported + expected) / (2 * MAX_WEIGHT)
+        red_flag = bool(len(active)) and int(active_weights.max()) >= RED_FLAG_WEIGHT
+        return {
+            'score': round(score, 3),
+            'tier': tier_for(score, red_flag),
+            'reported_severity': round(reported, 2),
+            'expected_severity': round(expected, 2),
+            'red_flag': red_flag
+        }